@@ -1,14 +1,20 @@
 """The AMASTech integration."""
 from __future__ import annotations
+import importlib
 import logging
+from typing import TYPE_CHECKING, Any
 
 
-import async_timeout
 import voluptuous as vol
 import asyncio
-from datetime import datetime
+import contextlib
+from datetime import timedelta
 
-from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
+from homeassistant.config_entries import (
+    SOURCE_IMPORT,
+    SOURCE_INTEGRATION_DISCOVERY,
+    ConfigEntry,
+)
 from homeassistant.const import (
     CONF_ACCESS_TOKEN,
     CONF_API_TOKEN,
@@ -16,12 +22,22 @@ from homeassistant.const import (
     CONF_NAME,
     Platform,
 )
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
-from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceCall, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import (
+    ConfigEntryAuthFailed,
+    ConfigEntryNotReady,
+    HomeAssistantError,
+)
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
@@ -32,14 +48,57 @@ from homeassistant.helpers.update_coordinator import (
 from .const import (
     DOMAIN, 
     DEFAULT_NAME, 
-    AMASHub,
+    ALERT_METRICS,
+    ALERT_RULES_STORAGE_VERSION,
+    ATTR_ABOVE,
+    ATTR_BELOW,
+    ATTR_DURATION,
+    ATTR_ENTRY_ID,
+    ATTR_HISTORY,
+    ATTR_HYSTERESIS,
+    ATTR_INTERVAL,
+    ATTR_METRIC,
+    ATTR_NAME,
+    ATTR_RULES,
+    ATTR_HOSTS,
+    ATTR_NETWORK,
+    ATTR_PATH,
+    ATTR_PORT,
+    ATTR_SPEED,
+    ATTR_TOP,
+    CONF_ENFORCE_LIGHT_SCHEDULE,
+    CONF_STREAM_ENDPOINT,
+    DATA_KEY_ALERTS,
     DATA_KEY_API,
     DATA_KEY_COORDINATOR,
-    MIN_TIME_BETWEEN_UPDATES
+    DATA_KEY_PLATFORMS,
+    DATA_KEY_SCHEDULER,
+    DATA_KEY_SESSIONS,
+    IMPORT_CONCURRENCY,
+    LIVENESS_OFFLINE_MAX_INTERVAL,
+    LIVENESS_PROBE_INTERVAL,
+    SERVICE_DISCOVER,
+    SERVICE_EXPORT_SNAPSHOT,
+    SERVICE_PROFILE,
+    SERVICE_REPLAY,
+    SERVICE_SET_ALERT_RULES,
+    SERVICE_START_CAPTURE,
+    SERVICE_STOP_CAPTURE,
+    SESSION_VERIFY_TIMEOUT,
+    STREAM_STALE_AFTER,
 )
 
+from .fanout import async_register_stream_view, async_setup_fanout
+from .outbox import CommandOutbox
+from .scheduler import StateWriteScheduler
+
+if TYPE_CHECKING:
+    from .hub import AMASHub
+
 _LOGGER = logging.getLogger(__name__)
 
+ALL_PLATFORMS = [Platform.SWITCH, Platform.SENSOR, Platform.BINARY_SENSOR, Platform.NUMBER, Platform.TIME]
+
 AMAS_SCHEMA = vol.Schema(
     vol.All(
         {
@@ -51,6 +110,60 @@ AMAS_SCHEMA = vol.Schema(
     )
 )
 
+DISCOVER_SCHEMA = vol.Schema(
+    {
+        vol.Exclusive(ATTR_NETWORK, 'target'): cv.string,
+        vol.Exclusive(ATTR_HOSTS, 'target'): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_PORT): cv.port,
+    }
+)
+
+CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_PATH): cv.string,
+    }
+)
+
+REPLAY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_SPEED, default=1.0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(vol.Coerce(float), vol.Range(min=1, max=3600)),
+        vol.Optional(ATTR_TOP, default=20): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_PATH): cv.string,
+    }
+)
+
+EXPORT_SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_HISTORY, default=False): cv.boolean,
+        vol.Optional(ATTR_INTERVAL): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+ALERT_RULE_SCHEMA = vol.All(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Required(ATTR_METRIC): vol.In(ALERT_METRICS),
+        vol.Exclusive(ATTR_ABOVE, 'threshold'): vol.Coerce(float),
+        vol.Exclusive(ATTR_BELOW, 'threshold'): vol.Coerce(float),
+        vol.Optional(ATTR_HYSTERESIS, default=0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    },
+    cv.has_at_least_one_key(ATTR_ABOVE, ATTR_BELOW),
+)
+
+ALERT_RULES_SCHEMA = vol.Schema(
+    {vol.Required(ATTR_RULES): vol.All(cv.ensure_list, [ALERT_RULE_SCHEMA])}
+)
+
 CONFIG_SCHEMA = vol.Schema(
     vol.All(
         cv.deprecated(DOMAIN),
@@ -63,20 +176,220 @@ CONFIG_SCHEMA = vol.Schema(
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the AMASTech integration."""
 
-    hass.data[DOMAIN] = {}
+    hass.data[DOMAIN] = {
+        DATA_KEY_SESSIONS: {},
+        DATA_KEY_SCHEDULER: StateWriteScheduler(hass),
+    }
+    async_setup_fanout(hass)
+
+    rules_store = Store(hass, ALERT_RULES_STORAGE_VERSION, f"{DOMAIN}.alert_rules")
+    hass.data[DOMAIN][DATA_KEY_ALERTS] = await _async_alert_engine(
+        hass, await rules_store.async_load() or []
+    )
+
+    async def async_set_alert_rules(call: ServiceCall) -> None:
+        """Replace the fleet alert rules."""
+        rules = call.data[ATTR_RULES]
+        await rules_store.async_save(rules)
+        if (engine := hass.data[DOMAIN][DATA_KEY_ALERTS]) is not None:
+            engine.async_stop()
+        hass.data[DOMAIN][DATA_KEY_ALERTS] = await _async_alert_engine(hass, rules)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_ALERT_RULES, async_set_alert_rules, schema=ALERT_RULES_SCHEMA
+    )
 
     # import
     if DOMAIN in config:
-        for conf in config[DOMAIN]:
+        hass.async_create_task(_async_import_yaml(hass, config[DOMAIN]))
+
+    async def async_discover(call: ServiceCall) -> None:
+        """Scan the LAN and start a config flow for every new tower."""
+        discovery = await hass.async_add_executor_job(
+            importlib.import_module, ".discovery", __name__
+        )
+        if ATTR_NETWORK in call.data:
+            try:
+                hosts = discovery.hosts_in_network(call.data[ATTR_NETWORK], call.data.get(ATTR_PORT))
+            except ValueError as err:
+                raise HomeAssistantError(f"Can't scan {call.data[ATTR_NETWORK]}: {err}") from err
+        else:
+            hosts = call.data.get(ATTR_HOSTS, [])
+        configured = {entry.data[CONF_HOST] for entry in hass.config_entries.async_entries(DOMAIN)}
+        found = await discovery.async_scan(
+            async_get_clientsession(hass), [host for host in hosts if host not in configured]
+        )
+        for host in found:
             hass.async_create_task(
                 hass.config_entries.flow.async_init(
-                    DOMAIN, context={"source": SOURCE_IMPORT}, data=conf
+                    DOMAIN,
+                    context={"source": SOURCE_INTEGRATION_DISCOVERY},
+                    data={CONF_HOST: host},
                 )
             )
 
+    async_register_admin_service(hass, DOMAIN, SERVICE_DISCOVER, async_discover, schema=DISCOVER_SCHEMA)
+
+    def hub_for(call: ServiceCall) -> AMASHub:
+        entry = hass.config_entries.async_get_entry(entry_id := call.data[ATTR_ENTRY_ID])
+        if (
+            entry is None
+            or entry.domain != DOMAIN
+            or (amas_data := hass.data[DOMAIN].get(entry_id)) is None
+        ):
+            raise HomeAssistantError(f"No loaded AMAS tower with entry id {entry_id}")
+        return amas_data[DATA_KEY_API]
+
+    def path_for(call: ServiceCall, default: str | None = None) -> str:
+        """Return the call's path if allowlist_external_dirs allows it."""
+        if (path := call.data.get(ATTR_PATH)) is None:
+            return default
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(
+                f"Access to {path} is not allowed, add its directory to allowlist_external_dirs"
+            )
+        return path
+
+    async def async_start_capture(call: ServiceCall) -> None:
+        """Record a tower's raw traffic to a capture file."""
+        path = path_for(call, hass.config.path(f"amas-{call.data[ATTR_ENTRY_ID]}.capture"))
+        await hub_for(call).async_start_capture(path)
+
+    async def async_stop_capture(call: ServiceCall) -> None:
+        """Stop recording a tower's traffic."""
+        await hub_for(call).async_stop_capture()
+
+    async def async_replay(call: ServiceCall) -> None:
+        """Feed a capture file back through a tower's decode path."""
+        capture = await hass.async_add_executor_job(
+            importlib.import_module, ".capture", __name__
+        )
+        await capture.async_replay(hub_for(call), path_for(call), call.data[ATTR_SPEED])
+
+    profiling = False
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the hub, crypto, coordinator and entity hot paths for a while."""
+        nonlocal profiling
+        if profiling:
+            raise HomeAssistantError("AMAS profiling is already running")
+        profiler_module = await hass.async_add_executor_job(
+            importlib.import_module, ".profiler", __name__
+        )
+        # Not the time module: the time platform shadows that name in this package
+        stamp = int(dt_util.utcnow().timestamp())
+        path = path_for(call, hass.config.path(f"amas-profile-{stamp}.prof"))
+        coordinators = [
+            amas_data[DATA_KEY_COORDINATOR]
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if (amas_data := hass.data[DOMAIN].get(entry.entry_id)) is not None
+        ]
+        profiler = profiler_module.ScopedProfiler()
+        profiling = True
+        profiler.start(coordinators)
+        try:
+            await asyncio.sleep(call.data[ATTR_DURATION])
+        finally:
+            profiler.stop()
+            profiling = False
+        await hass.async_add_executor_job(profiler.profile.dump_stats, path)
+        _LOGGER.warning(
+            "AMAS profile written to %s, top %d by cumulative time:\n%s",
+            path, call.data[ATTR_TOP], profiler.summary(call.data[ATTR_TOP]),
+        )
+
+    export_unsub: CALLBACK_TYPE | None = None
+
+    async def async_export_snapshot(call: ServiceCall) -> None:
+        """Write the fleet's reported state now, or every interval."""
+        nonlocal export_unsub
+        snapshot = await hass.async_add_executor_job(
+            importlib.import_module, ".snapshot", __name__
+        )
+        path = path_for(call, hass.config.path("amas-snapshot.jsonl"))
+        history = call.data[ATTR_HISTORY]
+
+        async def async_export(_now: Any = None) -> None:
+            records = snapshot.async_collect(hass, history)
+            lines = await hass.async_add_executor_job(snapshot.write_snapshot, path, records)
+            _LOGGER.debug("Wrote %d AMAS snapshot records to %s", lines, path)
+
+        if ATTR_INTERVAL in call.data:
+            if export_unsub is not None:
+                export_unsub()
+                export_unsub = None
+            # An interval of 0 only stops the periodic export
+            if not call.data[ATTR_INTERVAL]:
+                return
+            export_unsub = async_track_time_interval(
+                hass, async_export, timedelta(seconds=call.data[ATTR_INTERVAL])
+            )
+        try:
+            await async_export()
+        except OSError as err:
+            raise HomeAssistantError(f"Unable to write AMAS snapshot to {path}: {err}") from err
+
+    async_register_admin_service(hass, DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA)
+    async_register_admin_service(
+        hass, DOMAIN, SERVICE_EXPORT_SNAPSHOT, async_export_snapshot, schema=EXPORT_SNAPSHOT_SCHEMA
+    )
+    async_register_admin_service(hass, DOMAIN, SERVICE_START_CAPTURE, async_start_capture, schema=CAPTURE_SCHEMA)
+    async_register_admin_service(hass, DOMAIN, SERVICE_STOP_CAPTURE, async_stop_capture, schema=vol.Schema({vol.Required(ATTR_ENTRY_ID): cv.string}))
+    async_register_admin_service(hass, DOMAIN, SERVICE_REPLAY, async_replay, schema=REPLAY_SCHEMA)
+
     return True
 
 
+async def _async_import_yaml(hass: HomeAssistant, confs: list[ConfigType]) -> None:
+    """Validate YAML towers concurrently and import the ones that pass."""
+    configured = {entry.data[CONF_HOST] for entry in hass.config_entries.async_entries(DOMAIN)}
+    confs = [conf for conf in confs if conf[CONF_HOST] not in configured]
+    if not confs:
+        return
+    hub_class = await async_import_hub(hass)
+    session = async_get_clientsession(hass)
+    semaphore = asyncio.Semaphore(IMPORT_CONCURRENCY)
+
+    async def validate(conf: ConfigType) -> str:
+        async with semaphore:
+            hub = hub_class(conf[CONF_HOST], hass, session)
+            await hub.authenticate(conf[CONF_ACCESS_TOKEN], conf[CONF_API_TOKEN])
+            return str(hub.device_info['device_id'])
+
+    results = await asyncio.gather(*(validate(conf) for conf in confs), return_exceptions=True)
+    failed = []
+    for conf, result in zip(confs, results):
+        if isinstance(result, ConfigEntryAuthFailed):
+            failed.append(f"{conf[CONF_NAME]} ({conf[CONF_HOST]}): authentication failed")
+            continue
+        if isinstance(result, ConfigEntryNotReady):
+            failed.append(f"{conf[CONF_NAME]} ({conf[CONF_HOST]}): not reachable")
+            continue
+        if isinstance(result, BaseException):
+            failed.append(f"{conf[CONF_NAME]} ({conf[CONF_HOST]}): {result!r}")
+            continue
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_IMPORT, "device_id": result}, data=conf
+            )
+        )
+    if failed:
+        _LOGGER.warning(
+            "Imported %d of %d towers from YAML, failed: %s",
+            len(confs) - len(failed), len(confs), ", ".join(failed),
+        )
+
+
+async def _async_alert_engine(hass: HomeAssistant, rules: list[dict]) -> Any:
+    """Build the fleet alert engine, importing numpy only when there are rules."""
+    if not rules:
+        return None
+    alerts = await hass.async_add_executor_job(
+        importlib.import_module, ".alerts", __name__
+    )
+    return alerts.FleetAlertEngine(hass, rules)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up AMASTech from a config entry."""
 
@@ -84,71 +397,205 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     api_key = entry.data[CONF_ACCESS_TOKEN]
     name = entry.data[CONF_NAME]
     mactoken = entry.data[CONF_API_TOKEN]
-    api = AMASHub(host, hass, async_create_clientsession(hass))
-    if await api.authenticate(api_key, mactoken):
+    hub_class = await async_import_hub(hass)
+    api = hub_class(host, hass, async_get_clientsession(hass))
+    api.outbox = CommandOutbox(hass, entry.entry_id)
+    await api.outbox.async_load()
+    sessions = hass.data[DOMAIN][DATA_KEY_SESSIONS]
+    cached = sessions.get(entry.entry_id)
+    if cached is not None and cached.credentials == (api_key, mactoken):
+        # Reload: reuse the keys and identity, the stream confirms them
+        api.restore_session(cached)
+
+        @callback
+        def async_session_rejected() -> None:
+            sessions.pop(entry.entry_id, None)
+            hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+
+        api.session_rejected = async_session_rejected
+    elif await api.authenticate(api_key, mactoken):
         hass.config_entries.async_update_entry(entry, unique_id=('AMAS-'+str(api.device_info['device_id'])))
+        sessions[entry.entry_id] = api.export_session(api_key, mactoken)
     else: raise ConfigEntryAuthFailed
     
     # TODO 3. Store an API object for your platforms to access
     # hass.data[DOMAIN][entry.entry_id] = MyApi(...)
     
+    offline_interval = LIVENESS_PROBE_INTERVAL
+
     async def async_update_data() -> None:
-        """Fetch data from API endpoint.
+        """Check the stream is alive and reconnect when it has gone quiet.
 
+        Frames from the stream push updates to the coordinator directly, which
+        also pushes this check back, so it only runs once the stream is quiet.
         """
-        if api.stream_task is None:
+        nonlocal offline_interval
+        if api.stream_task is None or api.stream_task.done():
             api.stream_task = asyncio.create_task(api.stream_info())
-        now = datetime.now().strftime('%s')
-        last_update = api.last_update
-        if int(now) - int(last_update) > 180:
-            if await api.check_connection():
-                try:
-                    api.stream_task.cancel()
-                except: pass
-                await asyncio.sleep(5)
-                api.stream_task = asyncio.create_task(api.stream_info())
-            else:
-                raise ConfigEntryNotReady
-
+        age = api.stream_age
+        stale_after = STREAM_STALE_AFTER if api.verified else SESSION_VERIFY_TIMEOUT
+        if age <= stale_after:
+            offline_interval = LIVENESS_PROBE_INTERVAL
+            coordinator.update_interval = max(
+                timedelta(seconds=stale_after - age), LIVENESS_PROBE_INTERVAL
+            )
+            return
+        try:
+            await api.check_connection()
+        except (ConfigEntryNotReady, ConfigEntryAuthFailed) as err:
+            # Tower is offline, back off until it answers again
+            offline_interval = min(offline_interval * 2, LIVENESS_OFFLINE_MAX_INTERVAL)
+            coordinator.update_interval = offline_interval
+            raise UpdateFailed(f"{name} is not responding") from err
+        api.stream_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await api.stream_task
+        api.stream_task = asyncio.create_task(api.stream_info())
+        offline_interval = LIVENESS_PROBE_INTERVAL
+        coordinator.update_interval = LIVENESS_PROBE_INTERVAL
 
     coordinator = DataUpdateCoordinator(
         hass,
         _LOGGER,
         name=name,
         update_method=async_update_data,
-        update_interval=MIN_TIME_BETWEEN_UPDATES,
+        update_interval=LIVENESS_PROBE_INTERVAL,
     )
 
+    @callback
+    def async_report_received() -> None:
+        api.light_schedule.async_update(api.device_info)
+        coordinator.async_set_updated_data(None)
+        if (engine := hass.data[DOMAIN][DATA_KEY_ALERTS]) is not None:
+            engine.async_update(entry.entry_id, api.device_info)
+
+    api.update_listener = async_report_received
+    _async_apply_options(hass, entry, api)
+    api.light_schedule.async_update(api.device_info)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
     hass.data[DOMAIN][entry.entry_id] = {
         DATA_KEY_API: api,
         DATA_KEY_COORDINATOR: coordinator,
+        DATA_KEY_PLATFORMS: _async_platforms(hass, entry),
         }
 
-    await hass.config_entries.async_forward_entry_setups(entry, _async_platforms(entry))
+    await hass.config_entries.async_forward_entry_setups(
+        entry, hass.data[DOMAIN][entry.entry_id][DATA_KEY_PLATFORMS]
+    )
 
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the tower."""
+    _async_apply_options(hass, entry, hass.data[DOMAIN][entry.entry_id][DATA_KEY_API])
+
+
+@callback
+def _async_apply_options(hass: HomeAssistant, entry: ConfigEntry, api: AMASHub) -> None:
+    api.light_schedule.enforce = entry.options.get(CONF_ENFORCE_LIGHT_SCHEDULE, False)
+    if entry.options.get(CONF_STREAM_ENDPOINT, False):
+        async_register_stream_view(hass)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, _async_platforms(entry)):
-        hass.data[DOMAIN].pop(entry.entry_id)
+    platforms = hass.data[DOMAIN][entry.entry_id][DATA_KEY_PLATFORMS]
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, platforms):
+        api = hass.data[DOMAIN].pop(entry.entry_id)[DATA_KEY_API]
+        await api.async_shutdown()
+        if (engine := hass.data[DOMAIN][DATA_KEY_ALERTS]) is not None:
+            engine.async_forget(entry.entry_id)
+        if (cached := hass.data[DOMAIN][DATA_KEY_SESSIONS].get(entry.entry_id)) is not None:
+            cached.device_info = api.device_info
 
     return unload_ok
 
 
-# TODO List the platforms that you want to support.
-# For your initial PR, limit it to 1 platform.
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the cached session and buffered commands of a removed entry."""
+    hass.data.get(DOMAIN, {}).get(DATA_KEY_SESSIONS, {}).pop(entry.entry_id, None)
+    await CommandOutbox(hass, entry.entry_id).async_remove()
+
+
+async def async_import_hub(hass: HomeAssistant) -> type[AMASHub]:
+    """Import the hub, and with it cryptography, off the event loop."""
+    module = await hass.async_add_executor_job(
+        importlib.import_module, ".hub", __name__
+    )
+    return module.AMASHub
+
+
+@callback
+def _async_platforms(hass: HomeAssistant, entry: ConfigEntry) -> list[Platform]:
+    """Return platforms to be loaded / unloaded.
+
+    A platform whose registered entities are all disabled is skipped, it gets
+    loaded again by the reload that follows enabling one of them. New towers
+    without registered entities load everything.
+    """
+    registry = er.async_get(hass)
+    entries = er.async_entries_for_config_entry(registry, entry.entry_id)
+    if not entries:
+        return list(ALL_PLATFORMS)
+    enabled = {ent.domain for ent in entries if not ent.disabled}
+    registered = {ent.domain for ent in entries}
+    return [
+        platform
+        for platform in ALL_PLATFORMS
+        if platform in enabled or platform not in registered
+    ]
+
+
+def reports_field(device_info: dict[str, Any], source: tuple[str, ...]) -> bool:
+    """Return True if the reported state has a value at the source path."""
+    value: Any = device_info
+    for key in source:
+        if not isinstance(value, dict) or key not in value:
+            return False
+        value = value[key]
+    return True
+
+
 @callback
-def _async_platforms(entry: ConfigEntry) -> list[Platform]:
-    """Return platforms to be loaded / unloaded."""
-    platforms = [Platform.SWITCH, Platform.SENSOR, Platform.BINARY_SENSOR, Platform.NUMBER, Platform.TIME]
-    return platforms
+def async_add_reported_entities(
+    entry: ConfigEntry,
+    api: AMASHub,
+    coordinator: DataUpdateCoordinator,
+    entities: list[AMASTechEntity],
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add the entities whose field the tower reports.
+
+    The others wait for a report that has their field, so a tower only gets
+    the entities it supports and a firmware update can add new ones.
+    """
+    pending = entities
+
+    @callback
+    def async_add_reported() -> None:
+        nonlocal pending
+        if not pending:
+            return
+        reported = [entity for entity in pending if reports_field(api.device_info, entity.source)]
+        if reported:
+            pending = [entity for entity in pending if entity not in reported]
+            async_add_entities(reported, True)
+
+    async_add_reported()
+    if pending:
+        entry.async_on_unload(coordinator.async_add_listener(async_add_reported))
 
 
 class AMASTechEntity(CoordinatorEntity):
     """Representation of a AMASTech entity."""
 
+    # Routine updates of entities that don't write immediately are batched
+    _write_immediately = True
+    # Path of the field in the reported state the entity is built on
+    source: tuple[str, ...] = ()
+
     def __init__(
         self,
         api: AMASHub,
@@ -162,6 +609,23 @@ class AMASTechEntity(CoordinatorEntity):
         self._name = _name
         self._device_unique_id = _device_unique_id
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Hand the state write to the integration-wide scheduler."""
+        self.hass.data[DOMAIN][DATA_KEY_SCHEDULER].async_schedule(
+            self._device_unique_id, self, self._write_immediately
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop a queued state write."""
+        await super().async_will_remove_from_hass()
+        self.hass.data[DOMAIN][DATA_KEY_SCHEDULER].async_cancel(self._device_unique_id, self)
+
+    @property
+    def available(self) -> bool:
+        """Return False while the tower doesn't report the entity's field."""
+        return super().available and reports_field(self.api.device_info, self.source)
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return the device information of the entity."""
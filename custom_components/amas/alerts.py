@@ -0,0 +1,107 @@
+"""Fleet-wide threshold alerts evaluated over columnar readings."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import numpy as np
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    ALERT_BATCH_INTERVAL,
+    ALERT_METRICS,
+    ATTR_ABOVE,
+    ATTR_BELOW,
+    ATTR_HYSTERESIS,
+    ATTR_METRIC,
+    ATTR_NAME,
+    EVENT_ALERT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FleetAlertEngine:
+    """Keep the latest reading of every tower and evaluate all rules at once.
+
+    Readings live in a metrics x towers array and rule parameters in per-rule
+    columns, so one batch of updates is evaluated with a handful of array
+    operations however many towers and rules there are. A rule raises when
+    its metric goes above (or below) the threshold and clears once it comes
+    back past the threshold by the hysteresis. Events fire on transitions
+    only.
+    """
+
+    def __init__(self, hass: HomeAssistant, rules: list[dict[str, Any]]) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.rules = rules
+        self._entries: list[str] = []
+        self._columns: dict[str, int] = {}
+        self._values = np.full((len(ALERT_METRICS), 0), np.nan)
+        self._active = np.zeros((len(rules), 0), dtype=bool)
+        self._unsub: CALLBACK_TYPE | None = None
+        # Rules below a threshold are flipped so every rule compares "above"
+        sign = np.array([1.0 if ATTR_ABOVE in rule else -1.0 for rule in rules])
+        threshold = np.array([rule.get(ATTR_ABOVE, rule.get(ATTR_BELOW)) for rule in rules], dtype=float)
+        hysteresis = np.array([rule[ATTR_HYSTERESIS] for rule in rules], dtype=float)
+        self._metric = np.array([ALERT_METRICS.index(rule[ATTR_METRIC]) for rule in rules], dtype=np.intp)
+        self._sign = sign[:, None]
+        self._raise_above = (sign * threshold)[:, None]
+        self._clear_below = (sign * threshold - hysteresis)[:, None]
+
+    def _column(self, entry_id: str) -> int:
+        if (column := self._columns.get(entry_id)) is None:
+            column = self._columns[entry_id] = len(self._entries)
+            self._entries.append(entry_id)
+            self._values = np.hstack((self._values, np.full((len(ALERT_METRICS), 1), np.nan)))
+            self._active = np.hstack((self._active, np.zeros((len(self.rules), 1), dtype=bool)))
+        return column
+
+    @callback
+    def async_update(self, entry_id: str, report: dict[str, Any]) -> None:
+        """Store a tower's latest readings and schedule a batch evaluation."""
+        column = self._column(entry_id)
+        sensors = report.get('sensors', {})
+        for row, metric in enumerate(ALERT_METRICS):
+            value = sensors.get(metric)
+            self._values[row, column] = np.nan if value is None else value
+        if self._unsub is None:
+            self._unsub = async_call_later(self.hass, ALERT_BATCH_INTERVAL, self._async_evaluate)
+
+    @callback
+    def async_forget(self, entry_id: str) -> None:
+        """Stop alerting on an unloaded tower without firing clear events."""
+        if (column := self._columns.get(entry_id)) is not None:
+            self._values[:, column] = np.nan
+            self._active[:, column] = False
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel a pending evaluation."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_evaluate(self, _now: Any = None) -> None:
+        self._unsub = None
+        values = self._sign * self._values[self._metric]
+        # Missing readings compare False both ways and keep the current state
+        active = np.where(self._active, ~(values <= self._clear_below), values > self._raise_above)
+        changed = np.argwhere(active != self._active)
+        self._active = active
+        for rule_index, column in changed:
+            rule = self.rules[rule_index]
+            self.hass.bus.async_fire(
+                EVENT_ALERT,
+                {
+                    'entry_id': self._entries[column],
+                    'rule': rule[ATTR_NAME],
+                    'metric': rule[ATTR_METRIC],
+                    'value': float(self._values[self._metric[rule_index], column]),
+                    'active': bool(active[rule_index, column]),
+                },
+            )
@@ -1,10 +1,16 @@
 """Support for AMASTech Sensors."""
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 from homeassistant.config_entries import ConfigEntry
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.const import CONF_NAME
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -14,11 +20,72 @@ from .const import (
     DOMAIN as AMAS_DOMAIN,
     DATA_KEY_API,
     DATA_KEY_COORDINATOR,
-    BINARY_SENSOR_TYPES,
-    AMASHub,
-    AMASBinarySensorEntityDescription
     )
-from . import AMASTechEntity
+from . import AMASTechEntity, async_add_reported_entities
+
+if TYPE_CHECKING:
+    from .hub import AMASHub
+
+
+@dataclass
+class RequiredAMASBinaryDescription:
+    """Represent the required attributes of the AMASTech binary description."""
+
+    state_value: Callable[[AMASHub], bool]
+    source: tuple[str, ...]
+
+
+@dataclass
+class AMASBinarySensorEntityDescription(
+    BinarySensorEntityDescription, RequiredAMASBinaryDescription
+):
+    """Describes AMASTech binary sensor entity."""
+
+    extra_value: Callable[[AMASHub], dict[str, Any] | None] = lambda api: None
+
+
+BINARY_SENSOR_TYPES: tuple[AMASBinarySensorEntityDescription, ...] = (
+    AMASBinarySensorEntityDescription(
+        key="light_status",
+        source=('light', 'status'),
+        name="Light Status",
+        entity_registry_enabled_default=True,
+        device_class=BinarySensorDeviceClass.LIGHT,
+        state_value=lambda api: bool(api.device_info['light']['status']),
+    ),
+    AMASBinarySensorEntityDescription(
+        key="pump_status",
+        source=('pump', 'status'),
+        name="Pump Status",
+        entity_registry_enabled_default=True,
+        device_class=BinarySensorDeviceClass.RUNNING,
+        state_value=lambda api: bool(api.device_info['pump']['status']),
+    ),
+    AMASBinarySensorEntityDescription(
+        key="water_level_alert",
+        source=('alerts', 'water_level_alert'),
+        name="Water Level Alert",
+        entity_registry_enabled_default=True,
+        device_class=BinarySensorDeviceClass.BATTERY,
+        state_value=lambda api: api.device_info['alerts']['water_level_alert'] == 'Low',
+    ),
+    AMASBinarySensorEntityDescription(
+        key="amb_temp_alert",
+        source=('alerts', 'temp_alert'),
+        name="Ambient Temperature Alert",
+        entity_registry_enabled_default=False,
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        state_value=lambda api: api.device_info['alerts']['temp_alert'] == 'Low' or api.device_info['alerts']['temp_alert'] == 'High',
+    ),
+    AMASBinarySensorEntityDescription(
+        key="rel_humidity_alert",
+        source=('alerts', 'humidity_alert'),
+        name="Relative Humidity Alert",
+        entity_registry_enabled_default=False,
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        state_value=lambda api: api.device_info['alerts']['humidity_alert'] == 'Low' or api.device_info['alerts']['humidity_alert'] == 'High',
+    ),
+)
 
 
 async def async_setup_entry(
@@ -27,19 +94,15 @@ async def async_setup_entry(
     """Set up the AMAS binary sensor."""
     name = entry.data[CONF_NAME]
     amas_data = hass.data[AMAS_DOMAIN][entry.entry_id]
+    api = amas_data[DATA_KEY_API]
+    coordinator = amas_data[DATA_KEY_COORDINATOR]
 
     binary_sensors = [
-        AMASBinarySensor(
-            amas_data[DATA_KEY_API],
-            amas_data[DATA_KEY_COORDINATOR],
-            name,
-            entry.entry_id,
-            description,
-        )
+        AMASBinarySensor(api, coordinator, name, entry.entry_id, description)
         for description in BINARY_SENSOR_TYPES
     ]
 
-    async_add_entities(binary_sensors, True)
+    async_add_reported_entities(entry, api, coordinator, binary_sensors, async_add_entities)
 
 
 class AMASBinarySensor(AMASTechEntity, BinarySensorEntity):
@@ -58,6 +121,7 @@ class AMASBinarySensor(AMASTechEntity, BinarySensorEntity):
         """Initialize a AMAS sensor."""
         super().__init__(api, coordinator, _name, _device_unique_id)
         self.entity_description = description
+        self.source = description.source
         self._attr_name = f"{_name} {description.name}"
         self._attr_unique_id = f"{self._device_unique_id}/{description.name}"
 
@@ -0,0 +1,84 @@
+"""Circuit breaker isolating a failing tower."""
+from __future__ import annotations
+
+import logging
+from time import monotonic
+
+from .const import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker around the requests to one tower.
+
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail at once. Once reset_timeout has passed a single probe is let through
+    (half-open), its result closes the breaker or opens it again. A probe
+    that never reports back is given up on after another reset_timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+
+    def _probe_pending(self) -> bool:
+        return self._probing and monotonic() - self._probe_started < self.reset_timeout
+
+    @property
+    def blocked(self) -> bool:
+        """Return True if a call now would be refused, without taking the probe."""
+        if self.state == OPEN:
+            return monotonic() - self._opened_at < self.reset_timeout
+        return self.state == HALF_OPEN and self._probe_pending()
+
+    def allow(self) -> bool:
+        """Return True if a call may go to the tower."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probe_pending():
+            self._probing = True
+            self._probe_started = monotonic()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        if self.state != CLOSED:
+            _LOGGER.info("%s is responding again, closing circuit", self.name)
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker when needed."""
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.opened += 1
+                _LOGGER.warning(
+                    "%s failed %d times, opening circuit for %ss",
+                    self.name, self.failures, self.reset_timeout,
+                )
+            self.state = OPEN
+            self._opened_at = monotonic()
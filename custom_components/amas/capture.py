@@ -0,0 +1,110 @@
+"""Record and replay of raw encrypted tower traffic."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+import logging
+import queue
+import struct
+import threading
+from time import monotonic
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    from .hub import AMASHub
+
+_LOGGER = logging.getLogger(__name__)
+
+# Record kinds
+FRAME = 0
+CONTROL_REQUEST = 1
+CONTROL_RESPONSE = 2
+
+# Seconds since capture start, kind, payload length
+_HEADER = struct.Struct('<dBI')
+
+
+class TrafficRecorder:
+    """Append-only writer of timestamped tower traffic.
+
+    record() only queues a record, a writer thread appends it to the file so
+    the event loop never waits on the disk.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize."""
+        self.path = path
+        self.records = 0
+        self._queue: queue.SimpleQueue[tuple[bytes, bytes] | None] = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        self._started = monotonic()
+
+    def open(self) -> None:
+        """Open the capture file and start the writer, call from the executor."""
+        capture = open(self.path, 'ab')
+        self._writer = threading.Thread(
+            target=self._write, args=(capture,), name=f"amas_capture_{self.path}", daemon=True
+        )
+        self._writer.start()
+
+    def close(self) -> None:
+        """Write out queued records and close the file, call from the executor."""
+        if (writer := self._writer) is not None:
+            self._writer = None
+            self._queue.put(None)
+            writer.join()
+
+    def record(self, kind: int, data: bytes | str) -> None:
+        """Queue one record."""
+        if self._writer is None:
+            return
+        if isinstance(data, str):
+            data = data.encode()
+        self._queue.put((_HEADER.pack(monotonic() - self._started, kind, len(data)), data))
+        self.records += 1
+
+    def _write(self, capture: BinaryIO) -> None:
+        with capture:
+            while (record := self._queue.get()) is not None:
+                capture.write(record[0])
+                capture.write(record[1])
+
+
+def read_capture(path: str) -> Iterator[tuple[float, int, bytes]]:
+    """Yield (timestamp, kind, payload) records from a capture file."""
+    with open(path, 'rb') as capture:
+        while header := capture.read(_HEADER.size):
+            if len(header) < _HEADER.size:
+                # Truncated by an unclean shutdown
+                return
+            timestamp, kind, size = _HEADER.unpack(header)
+            data = capture.read(size)
+            if len(data) < size:
+                return
+            yield timestamp, kind, data
+
+
+async def async_replay(hub: AMASHub, path: str, speed: float = 1.0) -> int:
+    """Feed recorded frames and control replies through the hub's decode path.
+
+    A speed of 1 keeps the recorded pacing, 0 replays as fast as possible.
+    Returns the number of frames that were decoded.
+    """
+    records = await hub.hass.async_add_executor_job(
+        lambda: [record for record in read_capture(path) if record[1] != CONTROL_REQUEST]
+    )
+    decoded = 0
+    started = monotonic()
+    first = records[0][0] if records else 0.0
+    for timestamp, _, data in records:
+        if speed > 0:
+            delay = (timestamp - first) / speed - (monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if hub.handle_frame(data):
+            decoded += 1
+    _LOGGER.info(
+        "Replayed %d of %d records from %s in %.2fs",
+        decoded, len(records), path, monotonic() - started,
+    )
+    return decoded
@@ -12,15 +12,18 @@ from homeassistant.const import (
     CONF_HOST,
     CONF_NAME
 )
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from .const import (
     DOMAIN, 
     DEFAULT_NAME, 
-    AMASHub
+    CONF_ENFORCE_LIGHT_SCHEDULE,
+    CONF_STREAM_ENDPOINT,
 )
+from . import async_import_hub
 
 
 class AMASFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -32,12 +35,38 @@ class AMASFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self._config: dict = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> AMASOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return AMASOptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle a flow initiated by the user."""
         return await self.async_step_init(user_input)
 
+    async def async_step_import(self, import_info: dict[str, Any]) -> FlowResult:
+        """Import a YAML tower that async_setup already validated."""
+        await self.async_set_unique_id('AMAS-' + self.context['device_id'])
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=import_info[CONF_NAME], data=import_info)
+
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, Any]
+    ) -> FlowResult:
+        """Handle a tower found by the discover service."""
+        host = discovery_info[CONF_HOST]
+        self._async_abort_entries_match({CONF_HOST: host})
+        await self.async_set_unique_id(f"{DOMAIN}-{host}")
+        self._abort_if_unique_id_configured()
+        self._config[CONF_HOST] = host
+        self.context["title_placeholders"] = {CONF_HOST: host}
+        return await self.async_step_init(None)
+
     async def async_step_init(
         self, user_input: dict[str, Any] | None, is_import: bool = False
     ) -> FlowResult:
@@ -50,7 +79,8 @@ class AMASFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             name = user_input[CONF_NAME]
             mactoken = user_input[CONF_API_TOKEN]
             
-            hub = AMASHub(host, self.hass, async_create_clientsession(self.hass))
+            hub_class = await async_import_hub(self.hass)
+            hub = hub_class(host, self.hass, async_get_clientsession(self.hass))
 
             if await hub.authenticate(api_key, mactoken):
                 self._config[CONF_NAME] = name
@@ -71,7 +101,9 @@ class AMASFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user",
             data_schema=vol.Schema(
                 {
-                    vol.Required(CONF_HOST, default=user_input.get(CONF_HOST, '')): str,
+                    vol.Required(
+                        CONF_HOST, default=user_input.get(CONF_HOST, self._config.get(CONF_HOST, ''))
+                    ): str,
                     vol.Required(
                         CONF_NAME, default=user_input.get(CONF_NAME, DEFAULT_NAME)
                     ): str,
@@ -87,3 +119,34 @@ class AMASFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors=errors,
         )
+
+
+class AMASOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle AMASTech options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_ENFORCE_LIGHT_SCHEDULE,
+                        default=self.config_entry.options.get(CONF_ENFORCE_LIGHT_SCHEDULE, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_STREAM_ENDPOINT,
+                        default=self.config_entry.options.get(CONF_STREAM_ENDPOINT, False),
+                    ): bool,
+                }
+            ),
+        )
@@ -0,0 +1,59 @@
+"""Payload encryption for the AMASTech integration."""
+from __future__ import annotations
+
+import hashlib
+import os
+from binascii import a2b_base64, b2a_base64, hexlify
+from json import dumps
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives import padding
+
+
+# Bytes outside printable ASCII are stripped from decrypted payloads
+_NON_PRINTABLE = bytes(range(0x20)) + bytes(range(127, 256))
+
+def decrypt_bytes(payload, token):
+     """Decrypt a base64 payload straight from its buffer, without slicing copies."""
+     enc = memoryview(a2b_base64(payload))
+     decryptor = Cipher(algorithms.AES(token), modes.CBC(enc[:16])).decryptor()
+     data = bytearray(len(enc) - 1)  # update_into wants a block minus one byte of slack
+     size = decryptor.update_into(enc[16:], data)
+     decryptor.finalize()
+     del data[size:]
+     return data.translate(None, _NON_PRINTABLE)
+
+def decrypt(payload, token):
+     return decrypt_bytes(payload, token).decode()
+
+def encrypt(data, token):
+    padder = padding.PKCS7(128).padder()
+    data = padder.update(data) + padder.finalize()
+    IV = os.urandom(16)
+    cipher = Cipher(algorithms.AES(token), modes.CBC(IV))
+    encryptor = cipher.encryptor()
+    ct = encryptor.update(data) + encryptor.finalize()
+    enc = IV + ct
+    enc = b2a_base64(enc).decode().strip()
+    return enc
+
+def calculate_mac(enc):
+	cbcmac = hashlib.sha256(enc.encode())
+	cbcmac = hexlify(cbcmac.digest()).decode().strip()
+	return cbcmac
+
+# Encrypt and Calculate MAC
+def encryptAndMac(message, token, mactoken):
+	base64enc = encrypt(message, token)
+	cbcmac = calculate_mac(base64enc)
+	base64mac = encrypt(cbcmac.encode(), mactoken)
+	return dumps({'base64enc': base64enc, 'base64mac': base64mac})
+
+# Verify and Decrypt
+def decryptAndVerify(enc_and_mac, token, mactoken):
+	"""Return the decrypted payload as bytes ready for loads, or False."""
+	cbcmac = decrypt_bytes(enc_and_mac['base64mac'], mactoken)
+	if hexlify(hashlib.sha256(enc_and_mac['base64enc'].encode()).digest()) == cbcmac:
+		return decrypt_bytes(enc_and_mac['base64enc'], token)
+	else:
+		return False
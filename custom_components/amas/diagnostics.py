@@ -0,0 +1,44 @@
+"""Diagnostics support for AMASTech."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_KEY_API, DATA_KEY_SCHEDULER
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    api = hass.data[DOMAIN][entry.entry_id][DATA_KEY_API]
+    return {
+        "device_info": api.device_info,
+        "stream_age": api.stream_age,
+        "verified": api.verified,
+        "command_stats": api.command_stats,
+        "slow_steps": api.slow_steps,
+        "circuit": {
+            "state": api.breaker.state,
+            "failures": api.breaker.failures,
+            "opened": api.breaker.opened,
+        },
+        "stream_circuit": {
+            "state": api.stream_breaker.state,
+            "failures": api.stream_breaker.failures,
+            "opened": api.stream_breaker.opened,
+        },
+        "dropped_subscribers": api.fanout.dropped,
+        "outbox": api.outbox.pending if api.outbox is not None else None,
+        "light_schedule": {
+            "next_on": api.light_schedule.next_on,
+            "next_off": api.light_schedule.next_off,
+            "enforce": api.light_schedule.enforce,
+            "missed": api.light_schedule.missed,
+            "enforced": api.light_schedule.enforced,
+        },
+        "state_writes": hass.data[DOMAIN][DATA_KEY_SCHEDULER].as_dict(),
+        "memory_footprint": api.memory_footprint(),
+    }
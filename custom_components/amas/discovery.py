@@ -0,0 +1,81 @@
+"""LAN discovery of AMAS towers."""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import os
+from json import dumps, loads
+from time import monotonic
+
+import aiohttp
+import async_timeout
+
+from .const import DISCOVERY_CONCURRENCY, DISCOVERY_MAX_HOSTS, DISCOVERY_TIMEOUT
+from .crypto import encryptAndMac
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def hosts_in_network(network: str, port: int | None = None) -> list[str]:
+    """Return the host addresses of a network, e.g. 192.168.1.0/24.
+
+    Raises ValueError for an invalid network or one with more than
+    DISCOVERY_MAX_HOSTS addresses (wider than a /22).
+    """
+    ip_network = ipaddress.ip_network(network, strict=False)
+    if ip_network.num_addresses > DISCOVERY_MAX_HOSTS:
+        raise ValueError(
+            f"{network} has {ip_network.num_addresses} addresses, "
+            f"scan at most {DISCOVERY_MAX_HOSTS} at a time"
+        )
+    suffix = '' if port is None else ':' + str(port)
+    return [str(ip) + suffix for ip in ip_network.hosts()]
+
+
+async def async_probe_host(
+    session: aiohttp.ClientSession, host: str, timeout: float = DISCOVERY_TIMEOUT
+) -> bool:
+    """Return True if host answers /control like an AMAS tower.
+
+    The probe is encrypted with throwaway keys, so a tower can't decrypt it,
+    but it still answers with an encrypted and MACed envelope.
+    """
+    url = 'http://' + host + '/control'
+    body = loads(encryptAndMac(dumps({'state': {'desired': {}}}).encode(), os.urandom(16), os.urandom(16)))
+    try:
+        async with async_timeout.timeout(timeout):
+            response = await session.post(url, json=body)
+            payload = await response.json(content_type=None)
+    except Exception:
+        return False
+    return isinstance(payload, dict) and 'base64enc' in payload and 'base64mac' in payload
+
+
+async def async_scan(
+    session: aiohttp.ClientSession,
+    hosts: list[str],
+    concurrency: int = DISCOVERY_CONCURRENCY,
+    timeout: float = DISCOVERY_TIMEOUT,
+) -> list[str]:
+    """Probe hosts concurrently and return the ones that are AMAS towers.
+
+    A fixed pool of concurrency workers takes hosts one at a time, so the
+    number of coroutines doesn't grow with the number of hosts.
+    """
+    pending = iter(hosts)
+    towers: set[str] = set()
+
+    async def worker() -> None:
+        for host in pending:
+            if await async_probe_host(session, host, timeout):
+                towers.add(host)
+
+    started = monotonic()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(hosts)))))
+    found = [host for host in hosts if host in towers]
+    _LOGGER.info(
+        "Scanned %d hosts in %.1fs, found %d AMAS towers",
+        len(hosts), monotonic() - started, len(found),
+    )
+    return found
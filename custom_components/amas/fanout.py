@@ -0,0 +1,195 @@
+"""Local fan-out of decoded tower reports to other consumers."""
+from __future__ import annotations
+
+import asyncio
+from json import dumps
+import logging
+from typing import Any
+
+from aiohttp import web
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CONF_STREAM_ENDPOINT,
+    DATA_KEY_API,
+    DATA_KEY_STREAM_VIEW,
+    DOMAIN,
+    FANOUT_KEEPALIVE_INTERVAL,
+    FANOUT_QUEUE_SIZE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """A consumer of one tower's reports with its own bounded queue."""
+
+    def __init__(self, maxsize: int = FANOUT_QUEUE_SIZE) -> None:
+        """Initialize."""
+        self.queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(maxsize)
+        self.dropped = False
+
+
+class StreamFanout:
+    """Re-publish a tower's decoded reports to local subscribers.
+
+    A subscriber whose queue is full is dropped rather than slowing the
+    stream down; its queue then ends with None.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize."""
+        self.name = name
+        self.dropped = 0
+        self._subscribers: set[Subscriber] = set()
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Return True if anyone is listening."""
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Add a subscriber."""
+        subscriber = Subscriber()
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber."""
+        self._subscribers.discard(subscriber)
+
+    def publish(self, report: dict[str, Any]) -> None:
+        """Hand a report to every subscriber."""
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(report)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def close(self) -> None:
+        """End every subscription."""
+        for subscriber in list(self._subscribers):
+            self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        subscriber.dropped = True
+        self.dropped += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+        _LOGGER.debug("Dropped a subscriber of %s", self.name)
+
+
+def _fanout_for(hass: HomeAssistant, entry_id: str) -> StreamFanout | None:
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if (
+        entry is None
+        or entry.domain != DOMAIN
+        or (amas_data := hass.data.get(DOMAIN, {}).get(entry_id)) is None
+    ):
+        return None
+    return amas_data[DATA_KEY_API].fanout
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "amas/subscribe",
+        vol.Required("entry_id"): str,
+    }
+)
+@websocket_api.async_response
+async def websocket_subscribe(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Subscribe to a tower's decoded reports."""
+    if (fanout := _fanout_for(hass, msg["entry_id"])) is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Tower not loaded")
+        return
+    subscriber = fanout.subscribe()
+
+    async def forward() -> None:
+        while (report := await subscriber.queue.get()) is not None:
+            connection.send_message(websocket_api.event_message(msg["id"], report))
+        if subscriber.dropped:
+            connection.send_message(websocket_api.event_message(msg["id"], {"dropped": True}))
+
+    task = hass.async_create_task(forward())
+
+    @callback
+    def unsubscribe() -> None:
+        task.cancel()
+        fanout.unsubscribe(subscriber)
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+
+
+class AMASStreamView(HomeAssistantView):
+    """Server-sent events stream of a tower's decoded reports.
+
+    Only towers with the stream endpoint option enabled are served.
+    """
+
+    url = "/api/amas/stream/{entry_id}"
+    name = "api:amas:stream"
+
+    async def get(self, request: web.Request, entry_id: str) -> web.StreamResponse:
+        """Stream reports until the client goes away or falls behind.
+
+        An idle stream gets a keepalive comment every
+        FANOUT_KEEPALIVE_INTERVAL seconds, so a client that disconnected
+        while the tower is quiet doesn't hold its subscription forever.
+        """
+        hass: HomeAssistant = request.app["hass"]
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if (
+            entry is None
+            or not entry.options.get(CONF_STREAM_ENDPOINT, False)
+            or (fanout := _fanout_for(hass, entry_id)) is None
+        ):
+            return self.json_message("Tower not loaded", 404)
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        )
+        await response.prepare(request)
+        subscriber = fanout.subscribe()
+        try:
+            while request.transport is not None and not request.transport.is_closing():
+                try:
+                    report = await asyncio.wait_for(
+                        subscriber.queue.get(), FANOUT_KEEPALIVE_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    await response.write(b": keepalive\n\n")
+                    continue
+                if report is None:
+                    break
+                await response.write(b"data: " + dumps(report).encode() + b"\n\n")
+        except ConnectionResetError:
+            _LOGGER.debug("Stream client of %s went away", fanout.name)
+        finally:
+            fanout.unsubscribe(subscriber)
+        return response
+
+
+@callback
+def async_setup_fanout(hass: HomeAssistant) -> None:
+    """Register the websocket command."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@callback
+def async_register_stream_view(hass: HomeAssistant) -> None:
+    """Register the SSE view, once, when the first entry enables it.
+
+    Views can't be removed again, disabling the option makes the view
+    refuse that tower instead.
+    """
+    if not hass.data[DOMAIN].get(DATA_KEY_STREAM_VIEW):
+        hass.http.register_view(AMASStreamView())
+        hass.data[DOMAIN][DATA_KEY_STREAM_VIEW] = True
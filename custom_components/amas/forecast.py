@@ -0,0 +1,74 @@
+"""Online forecast of a tower's water level depletion."""
+from __future__ import annotations
+
+import math
+
+from .const import FORECAST_HALF_LIFE, FORECAST_MIN_SPAN, FORECAST_REFILL_JUMP
+
+
+class DepletionForecaster:
+    """Exponentially weighted least squares fit of water level over time.
+
+    Every sample updates five running sums, so a sample costs O(1) and no
+    history is kept. Older samples fade with the given half-life, and a jump
+    up of refill_jump points or more is taken as a refill and starts over.
+    """
+
+    def __init__(
+        self,
+        half_life: float = FORECAST_HALF_LIFE,
+        refill_jump: float = FORECAST_REFILL_JUMP,
+        min_span: float = FORECAST_MIN_SPAN,
+    ) -> None:
+        """Initialize."""
+        self._decay_rate = math.log(2) / half_life
+        self.refill_jump = refill_jump
+        self.min_span = min_span
+        self.refills = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        self.level: float | None = None
+        self._origin: float | None = None
+        self._last = 0.0
+        self._sw = self._st = self._sy = self._stt = self._sty = 0.0
+
+    def add(self, now: float, level: float) -> None:
+        """Add a sample taken at monotonic time now."""
+        if self.level is not None and level - self.level >= self.refill_jump:
+            self.refills += 1
+            self.reset()
+        if self._origin is None:
+            self._origin = now
+        t = now - self._origin
+        decay = math.exp(-self._decay_rate * (t - self._last))
+        self._sw = self._sw * decay + 1.0
+        self._st = self._st * decay + t
+        self._sy = self._sy * decay + level
+        self._stt = self._stt * decay + t * t
+        self._sty = self._sty * decay + t * level
+        self._last = t
+        self.level = level
+
+    @property
+    def slope(self) -> float | None:
+        """Return the fitted level change per second, None without enough data."""
+        if self._last < self.min_span:
+            return None
+        variance = self._sw * self._stt - self._st * self._st
+        if variance <= 0:
+            return None
+        return (self._sw * self._sty - self._st * self._sy) / variance
+
+    def seconds_until(self, target: float) -> float | None:
+        """Return seconds from the last sample until the fit reaches target.
+
+        None means the level is not falling, or there isn't enough data yet.
+        """
+        slope = self.slope
+        if slope is None or slope >= 0:
+            return None
+        intercept = (self._sy - slope * self._st) / self._sw
+        predicted = intercept + slope * self._last
+        return max(predicted - target, 0.0) / -slope
@@ -0,0 +1,520 @@
+"""Connection to a single AMAS tower."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+import logging
+import sys
+from binascii import a2b_base64
+from json import loads, dumps
+from time import monotonic, time
+from typing import Any
+
+import aiohttp
+import async_timeout
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers.event import async_call_later
+
+from .breaker import CLOSED, CircuitBreaker
+from .capture import CONTROL_REQUEST, CONTROL_RESPONSE, FRAME, TrafficRecorder
+from .const import (
+    COMMAND_DEADLINE,
+    EVENT_OUTBOX_REPLAYED,
+    HISTORY_SIZE,
+    LOOP_BLOCK_THRESHOLD,
+    OUTBOX_REPLAY_BACKOFF,
+    OUTBOX_REPLAY_MAX_BACKOFF,
+    PRIORITY_NORMAL,
+)
+from .crypto import decryptAndVerify, encryptAndMac
+from .fanout import StreamFanout
+from .forecast import DepletionForecaster
+from .light_schedule import LightSchedule
+from .outbox import CommandOutbox, merge_state
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class AMASSession:
+    """Key material and identity of a tower that already passed authentication."""
+
+    credentials: tuple[str, str]
+    api_key: bytes
+    mactoken: bytes
+    device_id: str
+    device_info: dict[str, Any] = field(default_factory=dict)
+
+
+class AMASHub:
+    """AMASHub class to check authentication and get device info.
+
+    """
+
+    def __init__(self, host: str, hass: HomeAssistant, session: aiohttp.ClientSession) -> None:
+        """Initialize."""
+        self.host = host
+        self.session = session
+        self.hass = hass
+        self.loop = hass.loop
+        self.api_key = ''
+        self.mactoken = ''
+        self.device_info = {}
+        self.last_update = 0.0
+        self.stream_task = None
+        self.update_listener: Callable[[], None] | None = None
+        self.command_task = None
+        self._command_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._command_seq = 0
+        # States of queued commands by sequence number, for memory_footprint
+        self._queued_states: dict[int, dict[str, Any]] = {}
+        self.command_stats = {'sent': 0, 'failed': 0, 'expired': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+        self.verified = False
+        self.expected_device_id: str | None = None
+        self.session_rejected: Callable[[], None] | None = None
+        self.recorder: TrafficRecorder | None = None
+        self.slow_steps = {'frame': 0, 'coordinator_update': 0}
+        # /control and the /metrics stream fail independently, a healthy
+        # stream must not hide a tower that rejects commands
+        self.breaker = CircuitBreaker(host)
+        self.stream_breaker = CircuitBreaker(f"{host} stream")
+        self.outbox: CommandOutbox | None = None
+        self._replay_task = None
+        self._replay_backoff = OUTBOX_REPLAY_BACKOFF
+        self._replay_unsub: CALLBACK_TYPE | None = None
+        self.fanout = StreamFanout(host)
+        self.water_forecast = DepletionForecaster()
+        # (wall clock time, report) of the latest reports, for snapshot exports
+        self.history: deque[tuple[float, dict[str, Any]]] = deque(maxlen=HISTORY_SIZE)
+        # Fed by the config entry only, so throwaway hubs never start a timer
+        self.light_schedule = LightSchedule(hass, self)
+
+    def _set_device_info(self, device_info: dict[str, Any]) -> None:
+        """Store a fresh report and notify the listener.
+
+        Only an identity mismatch raises. Errors of the report's consumers are
+        logged here, so they never count against the frame or command that
+        delivered the report.
+        """
+        if not self.verified:
+            if str(device_info.get('device_id')) != self.expected_device_id:
+                self._reject_session()
+                raise ConfigEntryAuthFailed
+            self.verified = True
+        self.device_info = device_info
+        self.last_update = monotonic()
+        self.history.append((time(), device_info))
+        if self.update_listener is not None:
+            self._notify(self.update_listener)
+            self._watch_step('coordinator_update', self.last_update)
+        if (water_level := device_info.get('sensors', {}).get('water_level')) is not None:
+            self._notify(self.water_forecast.add, self.last_update, water_level)
+        if self.fanout.has_subscribers:
+            self._notify(self.fanout.publish, device_info)
+
+    def _notify(self, consumer: Callable[..., None], *args: Any) -> None:
+        """Hand a report to one consumer, a failing one doesn't stop the others."""
+        try:
+            consumer(*args)
+        except Exception:
+            _LOGGER.exception("Error handling a report from %s", self.host)
+
+    def _watch_step(self, step: str, started: float) -> None:
+        """Count and warn about a step that held the event loop too long."""
+        elapsed = monotonic() - started
+        if elapsed > LOOP_BLOCK_THRESHOLD:
+            self.slow_steps[step] += 1
+            _LOGGER.warning(
+                "%s step for %s blocked the event loop for %.3fs (%d times so far)",
+                step, self.host, elapsed, self.slow_steps[step],
+            )
+
+    def _reject_session(self) -> None:
+        """Report that restored key material failed verification."""
+        if self.session_rejected is not None:
+            _LOGGER.warning("Cached session for %s failed verification", self.host)
+            self.session_rejected()
+            self.session_rejected = None
+
+    def export_session(self, api_key: str, mactoken: str) -> AMASSession:
+        """Return the verified key material and identity for reuse on reload."""
+        return AMASSession(
+            (api_key, mactoken),
+            self.api_key,
+            self.mactoken,
+            str(self.device_info['device_id']),
+            self.device_info,
+        )
+
+    def restore_session(self, session: AMASSession) -> None:
+        """Skip the handshake and reuse a cached session.
+
+        The first report decrypted with it has to carry the cached device id,
+        otherwise session_rejected is called so a full handshake can be done.
+        """
+        self.api_key = session.api_key
+        self.mactoken = session.mactoken
+        self.expected_device_id = session.device_id
+        self.device_info = session.device_info
+        self.last_update = monotonic()
+
+    async def async_start_capture(self, path: str) -> None:
+        """Start appending raw /metrics frames and /control exchanges to path."""
+        await self.async_stop_capture()
+        recorder = TrafficRecorder(path)
+        await self.hass.async_add_executor_job(recorder.open)
+        self.recorder = recorder
+        _LOGGER.info("Capturing traffic of %s to %s", self.host, path)
+
+    async def async_stop_capture(self) -> None:
+        """Stop capturing and close the capture file."""
+        if (recorder := self.recorder) is not None:
+            self.recorder = None
+            await self.hass.async_add_executor_job(recorder.close)
+            _LOGGER.info("Captured %d records to %s", recorder.records, recorder.path)
+
+    def _record(self, kind: int, data: bytes | str | dict[str, Any]) -> None:
+        """Capture a record, serializing a JSON body only while capturing."""
+        if self.recorder is not None:
+            self.recorder.record(kind, dumps(data) if isinstance(data, dict) else data)
+
+    def _guard(self) -> None:
+        """Fail fast while the tower's circuit is open."""
+        if not self.breaker.allow():
+            raise ConfigEntryNotReady(f"Circuit for {self.host} is open")
+
+    def handle_frame(self, data: bytes | str) -> bool:
+        """Decrypt a raw /metrics frame and store its report."""
+        started = monotonic()
+        try:
+            device_info = loads(decryptAndVerify(loads(data), self.api_key, self.mactoken))
+            device_info = device_info['state']['reported']
+        except Exception:
+            if not self.verified:
+                self._reject_session()
+            return False
+        self._watch_step('frame', started)
+        try:
+            self._set_device_info(device_info)
+        except ConfigEntryAuthFailed:
+            return False
+        return True
+
+    @callback
+    def _async_start_replay(self) -> None:
+        """Replay the outbox unless a replay runs or is backing off.
+
+        Called when the tower comes back online: on the first frame of a
+        stream connection and when a probe closes the control circuit.
+        """
+        if (
+            self.outbox is None
+            or not self.outbox.pending
+            or self._replay_task is not None
+            or self._replay_unsub is not None
+        ):
+            return
+        self._replay_task = asyncio.create_task(self._async_replay_outbox())
+
+    @callback
+    def _async_retry_replay(self, _now: Any) -> None:
+        self._replay_unsub = None
+        self._async_start_replay()
+
+    async def _async_replay_outbox(self) -> None:
+        """Send everything buffered while offline in one request."""
+        applied = self.outbox.pending
+        try:
+            replayed = await self.control_device({})
+        finally:
+            self._replay_task = None
+        if not replayed:
+            _LOGGER.debug("Replay to %s failed, retrying in %ss", self.host, self._replay_backoff)
+            self._replay_unsub = async_call_later(
+                self.hass, self._replay_backoff, self._async_retry_replay
+            )
+            self._replay_backoff = min(self._replay_backoff * 2, OUTBOX_REPLAY_MAX_BACKOFF)
+            return
+        self._replay_backoff = OUTBOX_REPLAY_BACKOFF
+        _LOGGER.info("Replayed buffered commands to %s: %s", self.host, str(applied))
+        self.hass.bus.async_fire(EVENT_OUTBOX_REPLAYED, {'host': self.host, 'applied': applied})
+
+    def water_seconds_until(self, level: float) -> float | None:
+        """Return forecast seconds from now until the water reaches level."""
+        seconds = self.water_forecast.seconds_until(level)
+        return None if seconds is None else max(seconds - self.stream_age, 0.0)
+
+    @property
+    def stream_age(self) -> float:
+        """Seconds since the last report was received."""
+        return monotonic() - self.last_update
+
+    async def authenticate(self, api_key: str, mactoken: str) -> bool:
+        """Test if we can decrypt responses.
+
+        Raises ConfigEntryAuthFailed when the tower refuses the keys, and
+        ConfigEntryNotReady when it can't be reached or answers with an error.
+        """
+        url = 'http://' + self.host + '/control'
+        try:
+            api_key = a2b_base64(api_key)
+            mactoken = a2b_base64(mactoken)
+            body=loads(encryptAndMac(dumps({'state': {'desired': {}}}).encode(), api_key, mactoken))
+            self._record(CONTROL_REQUEST, body)
+            # r = requests.get(url, headers=headers)
+            async with async_timeout.timeout(20):
+                response = await self.session.post(url, json=body)
+            if response.status == 200:
+                payload = await response.json()
+                self._record(CONTROL_RESPONSE, payload)
+                _LOGGER.debug("Reponse content: %s", payload)
+                try:
+                    device_info = loads(decryptAndVerify(payload, api_key, mactoken))
+                    device_info = device_info['state']['reported']
+                except: raise ConfigEntryAuthFailed
+                self.api_key = api_key
+                self.mactoken = mactoken
+                self.verified = True
+                self._set_device_info(device_info)
+                return True
+            if response.status in (401, 403):
+                raise ConfigEntryAuthFailed(f"Status code {response.status}")
+            raise ConfigEntryNotReady(f"Status code {response.status}")
+        except ConfigEntryAuthFailed:
+            _LOGGER.warning("%s refused the credentials", self.host)
+            raise
+        except Exception as e:
+            _LOGGER.warning("Failed to connect: %s", str(e))
+            raise ConfigEntryNotReady
+    
+    async def check_connection(self) -> bool:
+        """Test if we can reconnect, raise ConfigEntryNotReady if not."""
+        url = 'http://' + self.host + '/control'
+        self._guard()
+        try:
+            body=loads(encryptAndMac(dumps({'state': {'desired': {}}}).encode(), self.api_key, self.mactoken))
+            self._record(CONTROL_REQUEST, body)
+            async with async_timeout.timeout(20):
+                response = await self.session.post(url, json=body)
+            if response.status == 200:
+                payload = await response.json()
+                self._record(CONTROL_RESPONSE, payload)
+                _LOGGER.debug("Reponse content: %s", payload)
+                try:
+                    device_info = loads(decryptAndVerify(payload, self.api_key, self.mactoken))
+                    device_info = device_info['state']['reported']
+                except: raise ConfigEntryAuthFailed
+                self._set_device_info(device_info)
+                reconnected = self.breaker.state != CLOSED
+                self.breaker.record_success()
+                if reconnected:
+                    # Commands carry the outbox themselves, only a probe
+                    # that closes the circuit has to replay it
+                    if self._replay_unsub is not None:
+                        self._replay_unsub()
+                        self._replay_unsub = None
+                    self._replay_backoff = OUTBOX_REPLAY_BACKOFF
+                    self._async_start_replay()
+                return True
+            raise ConfigEntryNotReady(f"Status code {response.status}")
+        except Exception as e:
+            self.breaker.record_failure()
+            _LOGGER.warning("Failed to connect: %s", str(e))
+            raise ConfigEntryNotReady
+
+    async def control_device(
+        self,
+        state: dict[str, Any],
+        priority: int = PRIORITY_NORMAL,
+        deadline: float = COMMAND_DEADLINE,
+        buffer: bool = True,
+    ) -> bool:
+        """Queue a control command and wait for the tower to apply it.
+
+        Commands are sent one at a time, lowest priority value first and in
+        submission order within a priority. A command that is still queued
+        when its deadline (seconds from now) passes is dropped unsent.
+
+        With an outbox attached, a command that can't reach the tower is
+        merged into it instead of raising, and False is returned. Buffered
+        commands go out together with the next one, or when the stream is
+        back. Commands that are only valid now pass buffer=False, they are
+        sent on their own and raise when the tower can't be reached.
+        """
+        buffered = None
+        if buffer and self.outbox is not None and self.outbox.pending:
+            buffered = self.outbox.pending
+            state = merge_state(buffered, state)
+        try:
+            if self.breaker.blocked:
+                raise ConfigEntryNotReady(f"Circuit for {self.host} is open")
+            if self.command_task is None or self.command_task.done():
+                self.command_task = asyncio.create_task(self._process_commands())
+            future = self.loop.create_future()
+            self._command_seq += 1
+            now = monotonic()
+            self._queued_states[self._command_seq] = state
+            self._command_queue.put_nowait(
+                (priority, self._command_seq, now, now + deadline, state, future)
+            )
+            await future
+        except ConfigEntryNotReady:
+            if not buffer or self.outbox is None:
+                raise
+            self.outbox.add(state)
+            _LOGGER.warning("%s is offline, buffered command for replay: %s", self.host, str(state))
+            return False
+        if buffered is not None and self.outbox.pending is buffered:
+            self.outbox.clear()
+        return True
+
+    async def async_shutdown(self) -> None:
+        """Stop all background work and drop references to HA objects."""
+        self.update_listener = None
+        self.session_rejected = None
+        self.light_schedule.async_stop()
+        self.fanout.close()
+        if self._replay_unsub is not None:
+            self._replay_unsub()
+            self._replay_unsub = None
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._replay_task
+        await self.async_stop_commands()
+        await self.async_stop_capture()
+        if self.stream_task is not None:
+            self.stream_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.stream_task
+            self.stream_task = None
+
+    def memory_footprint(self) -> int:
+        """Return the approximate number of bytes held by this hub."""
+        seen: set[int] = set()
+
+        def sizeof(obj: Any) -> int:
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            size = sys.getsizeof(obj)
+            if isinstance(obj, dict):
+                size += sum(sizeof(key) + sizeof(value) for key, value in obj.items())
+            elif isinstance(obj, (list, tuple, set, deque)):
+                size += sum(sizeof(item) for item in obj)
+            return size
+
+        # Objects shared with HA (hass, session, tasks) count shallowly
+        return sys.getsizeof(self) + sizeof(self.__dict__)
+
+    async def async_stop_commands(self) -> None:
+        """Stop the command worker, failing anything still queued."""
+        if self.command_task is not None:
+            self.command_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.command_task
+            self.command_task = None
+        while not self._command_queue.empty():
+            future = self._command_queue.get_nowait()[-1]
+            if not future.done():
+                future.set_exception(ConfigEntryNotReady())
+        self._queued_states.clear()
+
+    async def _process_commands(self) -> None:
+        """Send queued commands, keeping a single request in flight."""
+        while True:
+            _, seq, queued, expires, state, future = await self._command_queue.get()
+            self._queued_states.pop(seq, None)
+            if future.done():
+                # Caller gave up waiting
+                continue
+            started = monotonic()
+            wait = started - queued
+            self.command_stats['wait_total'] += wait
+            self.command_stats['wait_max'] = max(self.command_stats['wait_max'], wait)
+            _LOGGER.debug("Command waited %.3fs in queue", wait)
+            if started >= expires:
+                self.command_stats['expired'] += 1
+                _LOGGER.warning("Dropping command past its deadline: %s", str(state))
+                future.set_exception(ConfigEntryNotReady())
+                continue
+            try:
+                await self._send_control(state, expires - started)
+            except asyncio.CancelledError:
+                # Stopped mid-request, don't leave the caller waiting
+                if not future.done():
+                    future.set_exception(ConfigEntryNotReady())
+                raise
+            except Exception as e:
+                self.command_stats['failed'] += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.command_stats['sent'] += 1
+                if not future.done():
+                    future.set_result(None)
+
+    async def _send_control(self, state: dict[str, Any], timeout: float) -> None:
+        """Post a desired state to the tower."""
+        url = 'http://' + self.host + '/control'
+        body = {'state': {'desired': state}}
+        payload = loads(encryptAndMac(dumps(body).encode(), self.api_key, self.mactoken).encode())
+        self._guard()
+        self._record(CONTROL_REQUEST, payload)
+        try:
+            # r = requests.post(url, headers=headers, body=body)
+            async with async_timeout.timeout(timeout):
+                response = await self.session.post(url, json=payload)
+                _LOGGER.debug("Response content: %s", str(response.content))
+            if response.status == 200:
+                device_info = await response.json()
+                self._record(CONTROL_RESPONSE, device_info)
+                _LOGGER.debug("Reponse content: %s", str(device_info))
+                try:
+                    device_info = loads(decryptAndVerify(device_info, self.api_key,self.mactoken))
+                except: raise ConfigEntryAuthFailed
+                device_info = device_info['state']['reported']
+                self._set_device_info(device_info)
+                self.breaker.record_success()
+                _LOGGER.debug("Device info: %s", str(response.content))
+            else:
+                _LOGGER.critical("Status code: "+str(response.status))
+                raise ConfigEntryNotReady
+        except Exception as e:
+            self.breaker.record_failure()
+            _LOGGER.warning("Failed to connect: %s", str(e))
+            raise ConfigEntryNotReady
+
+    async def stream_info(self) -> None:
+        url = 'http://' + self.host + '/metrics'
+        if not self.stream_breaker.allow():
+            return
+        try:
+            async with self.session.ws_connect(url) as ws:
+                connected = False
+                async for msg in ws:
+                    _LOGGER.debug('WSMsgType: ' + str(msg.type))
+                    if msg.type == aiohttp.WSMsgType.ERROR:
+                        self.stream_breaker.record_failure()
+                        await ws.close()
+                    elif msg.type in (aiohttp.WSMsgType.BINARY, aiohttp.WSMsgType.TEXT):
+                        self._record(FRAME, msg.data)
+                        if not self.handle_frame(msg.data):
+                            self.stream_breaker.record_failure()
+                            await ws.close()
+                        else:
+                            if not connected:
+                                connected = True
+                                self._async_start_replay()
+                            if self.stream_breaker.failures:
+                                self.stream_breaker.record_success()
+        except asyncio.CancelledError:
+            raise
+        except:
+            self.stream_breaker.record_failure()
+            _LOGGER.error('Streaming failed!')
@@ -0,0 +1,122 @@
+"""Light schedule of a tower with precomputed transitions."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import LIGHT_SCHEDULE_GRACE, PRIORITY_SCHEDULE, STREAM_STALE_AFTER
+
+if TYPE_CHECKING:
+    from .hub import AMASHub
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_hhmm(value: Any) -> tuple[int, int] | None:
+    """Return (hour, minute) of an HHMM string, None if it isn't one."""
+    value = str(value).zfill(4)
+    if len(value) != 4 or not value.isdigit():
+        return None
+    hour, minute = int(value[:2]), int(value[2:])
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def next_occurrence(hour: int, minute: int, now: datetime) -> datetime:
+    """Return the first UTC time at hour:minute after now.
+
+    The tower keeps its schedule in UTC, so whole days are added in UTC and
+    the local time of a transition follows DST when it is displayed.
+    """
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+class LightSchedule:
+    """Track the next light transitions of a tower with a single timer.
+
+    The transitions are recomputed only when the tower reports a different
+    schedule. LIGHT_SCHEDULE_GRACE seconds after each transition the reported
+    light status is checked, and with enforce set a missed transition is
+    corrected through the light override.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub: AMASHub) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.hub = hub
+        self.enforce = False
+        self.next_on: datetime | None = None
+        self.next_off: datetime | None = None
+        self.missed = 0
+        self.enforced = 0
+        self._times: tuple[Any, Any] | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_update(self, device_info: dict[str, Any]) -> None:
+        """Recompute the transitions if the reported schedule changed."""
+        light = device_info.get('light', {})
+        times = (light.get('on'), light.get('off'))
+        if times != self._times:
+            self._times = times
+            self._async_schedule()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the timer."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_schedule(self) -> None:
+        self.async_stop()
+        on, off = (parse_hhmm(value) for value in self._times or (None, None))
+        if on is None or off is None or on == off:
+            self.next_on = self.next_off = None
+            return
+        now = dt_util.utcnow()
+        self.next_on = next_occurrence(*on, now)
+        self.next_off = next_occurrence(*off, now)
+        self._unsub = async_track_point_in_utc_time(
+            self.hass,
+            self._async_verify,
+            min(self.next_on, self.next_off) + timedelta(seconds=LIGHT_SCHEDULE_GRACE),
+        )
+
+    @callback
+    def _async_verify(self, _now: datetime) -> None:
+        self._unsub = None
+        expected = self.next_on < self.next_off
+        # Without a recent report there is nothing to compare against
+        if self.hub.stream_age <= STREAM_STALE_AFTER:
+            status = bool(self.hub.device_info.get('light', {}).get('status'))
+            if status != expected:
+                self.missed += 1
+                _LOGGER.warning(
+                    "%s missed its light %s transition",
+                    self.hub.host, 'on' if expected else 'off',
+                )
+                if self.enforce:
+                    self.hass.async_create_task(self._async_enforce(expected))
+        self._async_schedule()
+
+    async def _async_enforce(self, on: bool) -> None:
+        # A correction replayed once the tower is back could contradict the
+        # schedule by then, so it is never buffered
+        try:
+            if await self.hub.control_device(
+                {'light': {'override': '1' if on else '0'}}, PRIORITY_SCHEDULE, buffer=False
+            ):
+                self.enforced += 1
+        except Exception as err:
+            _LOGGER.error("Unable to enforce the light schedule of %s: %s", self.hub.host, err)
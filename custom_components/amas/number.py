@@ -2,14 +2,19 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 import datetime
 
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
 
-from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.components.number import (
+    NumberEntity,
+    NumberEntityDescription,
+    NumberMode,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConditionError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -20,32 +25,54 @@ from .const import (
     DOMAIN as AMAS_DOMAIN,
     DATA_KEY_API,
     DATA_KEY_COORDINATOR,
-    NUMBER_TYPES,
-    AMASHub,
-    AMASNumberEntityDescription
+    PRIORITY_SCHEDULE,
     )
-from . import AMASTechEntity
+from . import AMASTechEntity, async_add_reported_entities
+
+if TYPE_CHECKING:
+    from .hub import AMASHub
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass
+class AMASNumberEntityDescription(NumberEntityDescription):
+    """Describes AMASTech number entity."""
+
+    icon: str = "mdi:leaf"
+
+
+NUMBER_TYPES: tuple[AMASNumberEntityDescription, ...] = (
+    AMASNumberEntityDescription(
+        key="pump_interval",
+        name="Pump Interval",
+        icon="mdi:water-pump-off",
+        native_max_value=86399,
+        native_min_value=600,
+    ),
+    AMASNumberEntityDescription(
+        key="pump_runtime",
+        name="Pump Runtime",
+        icon="mdi:water-pump",
+        native_max_value=86399,
+        native_min_value=60,
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up AMAS Tech Sensors."""
     name = entry.data[CONF_NAME]
     amas_data = hass.data[AMAS_DOMAIN][entry.entry_id]
+    api = amas_data[DATA_KEY_API]
+    coordinator = amas_data[DATA_KEY_COORDINATOR]
     numbers = [
-        AMASNumber(
-            amas_data[DATA_KEY_API],
-            amas_data[DATA_KEY_COORDINATOR],
-            name,
-            entry.entry_id,
-            description,
-        )
+        AMASNumber(api, coordinator, name, entry.entry_id, description)
         for description in NUMBER_TYPES
     ]
-    async_add_entities(numbers, True)
+    async_add_reported_entities(entry, api, coordinator, numbers, async_add_entities)
 
 
 class AMASNumber(AMASTechEntity, NumberEntity):
@@ -64,6 +91,7 @@ class AMASNumber(AMASTechEntity, NumberEntity):
         """Initialize a AMAS sensor."""
         super().__init__(api, coordinator, _name, _device_unique_id)
         self.entity_description = description
+        self.source = tuple(description.key.split('_'))
 
         self._attr_name = f"{_name} {description.name}"
         self._attr_unique_id = f"{self._device_unique_id}/{description.name}"
@@ -85,5 +113,5 @@ class AMASNumber(AMASTechEntity, NumberEntity):
         act_key = str(self.entity_description.key).split('_')
         value = int(float(value))
         _LOGGER.debug("Got pump control " + act_key[1] + ': ' + str(value))
-        await self.api.control_device({act_key[0]: {act_key[1]: value}})
+        await self.api.control_device({act_key[0]: {act_key[1]: value}}, PRIORITY_SCHEDULE)
         
@@ -0,0 +1,47 @@
+"""Buffer of control commands for a tower that is offline."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, OUTBOX_SAVE_DELAY, OUTBOX_STORAGE_VERSION
+
+
+def merge_state(base: dict[str, Any], update: dict[str, Any]) -> dict[str, Any]:
+    """Return base with update merged in, the last value wins per field."""
+    merged = dict(base)
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_state(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class CommandOutbox:
+    """Persisted desired state that still has to reach a tower."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self._store: Store = Store(hass, OUTBOX_STORAGE_VERSION, f"{DOMAIN}.outbox.{entry_id}")
+        self.pending: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        """Load commands left over from before a restart."""
+        self.pending = await self._store.async_load() or {}
+
+    def add(self, state: dict[str, Any]) -> None:
+        """Merge a command into the outbox."""
+        self.pending = merge_state(self.pending, state)
+        self._store.async_delay_save(lambda: self.pending, OUTBOX_SAVE_DELAY)
+
+    def clear(self) -> None:
+        """Forget commands that were applied."""
+        self.pending = {}
+        self._store.async_delay_save(lambda: self.pending, OUTBOX_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the stored outbox."""
+        await self._store.async_remove()
@@ -0,0 +1,135 @@
+"""Scoped profiling of the integration's hot paths."""
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import sys
+import types
+from typing import Any
+
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from . import hub as hub_module
+from . import AMASTechEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+PLATFORM_MODULES = ('sensor', 'binary_sensor', 'number', 'time', 'switch')
+ENTITY_PROPERTIES = ('native_value', 'is_on', 'extra_state_attributes')
+SYNC_HUB_METHODS = ('handle_frame',)
+ASYNC_HUB_METHODS = ('check_connection', '_send_control')
+CRYPTO_FUNCTIONS = ('decryptAndVerify', 'encryptAndMac')
+
+
+class ScopedProfiler:
+    """cProfile that only runs inside the patched hot paths.
+
+    Nothing is patched until start(), and stop() puts the originals back, so
+    there is no overhead while profiling is off.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.profile = cProfile.Profile()
+        self._depth = 0
+        self._active = False
+        self._patches: list[tuple[Any, str, Any]] = []
+
+    def _enter(self) -> None:
+        # Coroutines still running after stop() keep calling in
+        if self._depth == 0 and self._active:
+            self.profile.enable()
+        self._depth += 1
+
+    def _exit(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self.profile.disable()
+
+    def _wrap_sync(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            self._enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit()
+
+        return wrapper
+
+    @types.coroutine
+    def _drive(self, coro: Coroutine) -> Any:
+        """Run a coroutine, profiling its own steps but not its suspensions."""
+        value: Any = None
+        error: BaseException | None = None
+        while True:
+            self._enter()
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._exit()
+            try:
+                value, error = (yield yielded), None
+            except BaseException as err:
+                value, error = None, err
+
+    def _wrap_async(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await self._drive(func(*args, **kwargs))
+
+        return wrapper
+
+    def _patch(self, owner: Any, name: str, value: Any) -> None:
+        self._patches.append((owner, name, owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def start(self, coordinators: list[DataUpdateCoordinator]) -> None:
+        """Patch the hot paths."""
+        self._active = True
+        hub_class = hub_module.AMASHub
+        for name in SYNC_HUB_METHODS:
+            self._patch(hub_class, name, self._wrap_sync(getattr(hub_class, name)))
+        for name in ASYNC_HUB_METHODS:
+            self._patch(hub_class, name, self._wrap_async(getattr(hub_class, name)))
+        for name in CRYPTO_FUNCTIONS:
+            self._patch(hub_module, name, self._wrap_sync(getattr(hub_module, name)))
+        for coordinator in coordinators:
+            if coordinator.update_method is not None:
+                self._patch(coordinator, 'update_method', self._wrap_async(coordinator.update_method))
+        package = __name__.rpartition('.')[0]
+        for platform in PLATFORM_MODULES:
+            if (module := sys.modules.get(f"{package}.{platform}")) is None:
+                continue
+            for cls in vars(module).values():
+                if not (isinstance(cls, type) and issubclass(cls, AMASTechEntity)):
+                    continue
+                for name in ENTITY_PROPERTIES:
+                    if isinstance(prop := cls.__dict__.get(name), property):
+                        self._patch(cls, name, property(self._wrap_sync(prop.fget)))
+
+    def stop(self) -> None:
+        """Put the original functions back."""
+        self._active = False
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+        self.profile.disable()
+
+    def summary(self, top: int) -> str:
+        """Return the top entries by cumulative time."""
+        self.profile.create_stats()
+        if not self.profile.stats:
+            return "No calls recorded"
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(top)
+        return stream.getvalue()
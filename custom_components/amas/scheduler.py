@@ -0,0 +1,99 @@
+"""Integration-wide budget for entity state writes."""
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later
+
+from .const import STATE_WRITE_BUDGET, STATE_WRITE_INTERVAL
+
+
+class StateWriteScheduler:
+    """Spread routine state writes of all towers over time.
+
+    Urgent entities (alerts, switches) write straight away. Everything else
+    is queued per tower, repeated updates of a queued entity are merged, and
+    at most budget writes go out every interval, taking one entity from each
+    tower in turn so a chatty tower can't starve the others.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        budget: int = STATE_WRITE_BUDGET,
+        interval: float = STATE_WRITE_INTERVAL,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.budget = budget
+        self.interval = interval
+        self.immediate = 0
+        self.deferred = 0
+        self.merged = 0
+        self.written = 0
+        self._pending: dict[str, dict[Entity, None]] = {}
+        self._rotation: deque[str] = deque()
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_schedule(self, tower: str, entity: Entity, immediate: bool) -> None:
+        """Write an entity's state now or queue it for the next flush."""
+        if immediate:
+            self.immediate += 1
+            entity.async_write_ha_state()
+            return
+        if (pending := self._pending.get(tower)) is None:
+            pending = self._pending[tower] = {}
+            self._rotation.append(tower)
+        if entity in pending:
+            self.merged += 1
+            return
+        pending[entity] = None
+        self.deferred += 1
+        if self._unsub is None:
+            self._unsub = async_call_later(self.hass, self.interval, self._async_flush)
+
+    @callback
+    def async_cancel(self, tower: str, entity: Entity) -> None:
+        """Drop a queued write of an entity that is going away."""
+        if (pending := self._pending.get(tower)) is not None:
+            pending.pop(entity, None)
+            if not pending:
+                del self._pending[tower]
+                self._rotation.remove(tower)
+        if not self._pending and self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_flush(self, _now: Any = None) -> None:
+        self._unsub = None
+        budget = self.budget
+        while budget and self._rotation:
+            tower = self._rotation.popleft()
+            pending = self._pending[tower]
+            if pending:
+                entity = next(iter(pending))
+                del pending[entity]
+                entity.async_write_ha_state()
+                self.written += 1
+                budget -= 1
+            if pending:
+                self._rotation.append(tower)
+            else:
+                del self._pending[tower]
+        if self._rotation:
+            self._unsub = async_call_later(self.hass, self.interval, self._async_flush)
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters."""
+        return {
+            "immediate": self.immediate,
+            "deferred": self.deferred,
+            "merged": self.merged,
+            "written": self.written,
+            "queued": sum(len(pending) for pending in self._pending.values()),
+        }
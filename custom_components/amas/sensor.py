@@ -1,27 +1,121 @@
 """Support for AMASTech Sensors."""
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_NAME, TEMP_CELSIUS, PERCENTAGE, TIME_HOURS
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
 
 from .const import (
     DOMAIN as AMAS_DOMAIN,
     DATA_KEY_API,
     DATA_KEY_COORDINATOR,
-    SENSOR_TYPES,
-    AMASHub,
-    AMASSensorEntityDescription
+    WATER_EMPTY_LEVEL,
+    WATER_REFILL_LEVEL,
     )
-from . import AMASTechEntity
+from . import AMASTechEntity, async_add_reported_entities
+
+if TYPE_CHECKING:
+    from .hub import AMASHub
+
+@dataclass
+class AMASSensorEntityDescription(SensorEntityDescription):
+    """Describes AMASTech sensor entity."""
+
+    icon: str = "mdi:leaf"
+    source: tuple[str, ...] = ()
+    value_fn: Callable[[AMASHub], Any] | None = None
+
+
+def _hours_until_empty(api: AMASHub) -> float | None:
+    seconds = api.water_seconds_until(WATER_EMPTY_LEVEL)
+    return None if seconds is None else round(seconds / 3600, 1)
+
+
+def _refill_by(api: AMASHub) -> datetime | None:
+    seconds = api.water_seconds_until(WATER_REFILL_LEVEL)
+    if seconds is None:
+        return None
+    return (dt_util.utcnow() + timedelta(seconds=seconds)).replace(second=0, microsecond=0)
+
+
+SENSOR_TYPES: tuple[AMASSensorEntityDescription, ...] = (
+    AMASSensorEntityDescription(
+        key="ambient_temperature",
+        source=('sensors', 'ambient_temperature'),
+        name="Ambient Temperature",
+        native_unit_of_measurement=TEMP_CELSIUS,
+        icon="mdi:thermometer",
+        device_class=SensorDeviceClass.TEMPERATURE,
+    ),
+    AMASSensorEntityDescription(
+        key="relative_humidity",
+        source=('sensors', 'relative_humidity'),
+        name="Relative Humidity",
+        native_unit_of_measurement=PERCENTAGE,
+        icon="mdi:water-percent",
+        device_class=SensorDeviceClass.HUMIDITY,
+    ),
+    AMASSensorEntityDescription(
+        key="water_level",
+        source=('sensors', 'water_level'),
+        name="Water Level",
+        native_unit_of_measurement=PERCENTAGE,
+        entity_registry_enabled_default=False,
+        icon="mdi:waves-arrow-up",
+    ),
+    AMASSensorEntityDescription(
+        key="water_time_until_empty",
+        source=('sensors', 'water_level'),
+        name="Water Time Until Empty",
+        native_unit_of_measurement=TIME_HOURS,
+        entity_registry_enabled_default=False,
+        icon="mdi:timer-sand",
+        device_class=SensorDeviceClass.DURATION,
+        value_fn=_hours_until_empty,
+    ),
+    AMASSensorEntityDescription(
+        key="next_light_on",
+        source=('light', 'on'),
+        name="Next Light On",
+        icon="mdi:lightbulb-on",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda api: api.light_schedule.next_on,
+    ),
+    AMASSensorEntityDescription(
+        key="next_light_off",
+        source=('light', 'off'),
+        name="Next Light Off",
+        icon="mdi:lightbulb-off-outline",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda api: api.light_schedule.next_off,
+    ),
+    AMASSensorEntityDescription(
+        key="water_refill_by",
+        source=('sensors', 'water_level'),
+        name="Water Refill By",
+        entity_registry_enabled_default=False,
+        icon="mdi:water-plus",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=_refill_by,
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -29,23 +123,20 @@ async def async_setup_entry(
     """Set up AMAS Tech Sensors."""
     name = entry.data[CONF_NAME]
     amas_data = hass.data[AMAS_DOMAIN][entry.entry_id]
+    api = amas_data[DATA_KEY_API]
+    coordinator = amas_data[DATA_KEY_COORDINATOR]
     sensors = [
-        AMASSensor(
-            amas_data[DATA_KEY_API],
-            amas_data[DATA_KEY_COORDINATOR],
-            name,
-            entry.entry_id,
-            description,
-        )
+        AMASSensor(api, coordinator, name, entry.entry_id, description)
         for description in SENSOR_TYPES
     ]
-    async_add_entities(sensors, True)
+    async_add_reported_entities(entry, api, coordinator, sensors, async_add_entities)
 
 
 class AMASSensor(AMASTechEntity, SensorEntity):
     """Representation of a AMAS sensor."""
 
     entity_description: AMASSensorEntityDescription
+    _write_immediately = False
 
     def __init__(
         self,
@@ -58,6 +149,7 @@ class AMASSensor(AMASTechEntity, SensorEntity):
         """Initialize a AMAS sensor."""
         super().__init__(api, coordinator, _name, _device_unique_id)
         self.entity_description = description
+        self.source = description.source
 
         self._attr_name = f"{_name} {description.name}"
         self._attr_unique_id = f"{self._device_unique_id}/{description.name}"
@@ -65,5 +157,7 @@ class AMASSensor(AMASTechEntity, SensorEntity):
     @property
     def native_value(self) -> Any:
         """Return the state of the device."""
+        if self.entity_description.value_fn is not None:
+            return self.entity_description.value_fn(self.api)
         return round(self.api.device_info['sensors'][self.entity_description.key], 2)
         
@@ -0,0 +1,56 @@
+"""Export of the fleet's reported state as JSON Lines."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import gzip
+from json import dumps
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_KEY_API
+
+
+@callback
+def async_collect(hass: HomeAssistant, history: bool) -> list[dict[str, Any]]:
+    """Return one record per tower, and per buffered report with history.
+
+    Reports are replaced, never mutated, so the records only hold references
+    and serializing them can happen off the event loop.
+    """
+    records = []
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (amas_data := hass.data[DOMAIN].get(entry.entry_id)) is None:
+            continue
+        api = amas_data[DATA_KEY_API]
+        if history:
+            records.extend(
+                {'entry_id': entry.entry_id, 'host': api.host, 'time': reported, 'state': report}
+                for reported, report in api.history
+            )
+        elif api.device_info:
+            records.append({
+                'entry_id': entry.entry_id,
+                'host': api.host,
+                'time': api.history[-1][0] if api.history else None,
+                'state': api.device_info,
+            })
+    return records
+
+
+def write_snapshot(path: str, records: Iterable[dict[str, Any]]) -> int:
+    """Write records one line at a time, call from the executor.
+
+    A path ending in .gz is gzip compressed. The file is replaced atomically
+    so a reader never sees a partial snapshot. Returns the number of lines.
+    """
+    partial = f"{path}.partial"
+    lines = 0
+    with (gzip.open if path.endswith('.gz') else open)(partial, 'wt', encoding='utf-8') as snapshot:
+        for record in records:
+            snapshot.write(dumps(record, separators=(',', ':')))
+            snapshot.write('\n')
+            lines += 1
+    os.replace(partial, path)
+    return lines
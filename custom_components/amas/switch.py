@@ -13,8 +13,9 @@ from .const import (
     DOMAIN as AMAS_DOMAIN,
     DATA_KEY_API,
     DATA_KEY_COORDINATOR,
+    PRIORITY_SAFETY,
     )
-from . import AMASTechEntity
+from . import AMASTechEntity, async_add_reported_entities
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,33 +25,21 @@ async def async_setup_entry(
     """Set up AMAS Tech switches."""
     name = entry.data[CONF_NAME]
     amas_data = hass.data[AMAS_DOMAIN][entry.entry_id]
+    api = amas_data[DATA_KEY_API]
+    coordinator = amas_data[DATA_KEY_COORDINATOR]
     switches = [
-        AMASCirculationSwitch(
-            amas_data[DATA_KEY_API],
-            amas_data[DATA_KEY_COORDINATOR],
-            name+' Circulation',
-            entry.entry_id,
-        ),
-        AMASDrainSwitch(
-            amas_data[DATA_KEY_API],
-            amas_data[DATA_KEY_COORDINATOR],
-            name+' Drain',
-            entry.entry_id,
-        ),
-        AMASLightOverrideSwitch(
-            amas_data[DATA_KEY_API],
-            amas_data[DATA_KEY_COORDINATOR],
-            name+' Light Override',
-            entry.entry_id,
-        )
+        AMASCirculationSwitch(api, coordinator, name+' Circulation', entry.entry_id),
+        AMASDrainSwitch(api, coordinator, name+' Drain', entry.entry_id),
+        AMASLightOverrideSwitch(api, coordinator, name+' Light Override', entry.entry_id),
     ]
-    async_add_entities(switches, True)
+    async_add_reported_entities(entry, api, coordinator, switches, async_add_entities)
 
 
 class AMASCirculationSwitch(AMASTechEntity, SwitchEntity):
     """Representation of a AMAS switch."""
 
     _attr_icon = "mdi:cached"
+    source = ('pump', 'powered')
 
     @property
     def name(self) -> str:
@@ -87,6 +76,7 @@ class AMASDrainSwitch(AMASTechEntity, SwitchEntity):
     """Representation of a AMAS switch."""
 
     _attr_icon = "mdi:water-minus"
+    source = ('pump', 'drain')
 
     @property
     def name(self) -> str:
@@ -115,7 +105,7 @@ class AMASDrainSwitch(AMASTechEntity, SwitchEntity):
         """Turn off the service."""
         try:
             _LOGGER.debug("Sending drain off.")
-            await self.api.control_device({'pump': {'drain': False}})
+            await self.api.control_device({'pump': {'drain': False}}, PRIORITY_SAFETY)
         except Exception as err:
             _LOGGER.error("Unable to turn off drain: %s", err)
 
@@ -123,6 +113,7 @@ class AMASLightOverrideSwitch(AMASTechEntity, SwitchEntity):
     """Representation of a AMAS switch."""
 
     _attr_icon = "mdi:lightbulb-alert-outline"
+    source = ('light', 'status')
 
     @property
     def name(self) -> str:
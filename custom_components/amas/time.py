@@ -2,14 +2,15 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 from datetime import time, datetime
 
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
 
-from homeassistant.components.time import TimeEntity
+from homeassistant.components.time import TimeEntity, TimeEntityDescription
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConditionError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -20,14 +21,36 @@ from .const import (
     DOMAIN as AMAS_DOMAIN,
     DATA_KEY_API,
     DATA_KEY_COORDINATOR,
-    TIME_TYPES,
-    AMASHub,
-    AMASTimeEntityDescription
+    PRIORITY_SCHEDULE,
     )
-from . import AMASTechEntity
+from . import AMASTechEntity, async_add_reported_entities
+
+if TYPE_CHECKING:
+    from .hub import AMASHub
 
 _LOGGER = logging.getLogger(__name__)
 
+@dataclass
+class AMASTimeEntityDescription(TimeEntityDescription):
+    """Describes AMASTech time entity."""
+
+    icon: str = "mdi:leaf"
+
+
+TIME_TYPES: tuple[AMASTimeEntityDescription, ...] = (
+    AMASTimeEntityDescription(
+        key="light_on",
+        name="Light On",
+        icon="mdi:lightbulb-on",
+    ),
+    AMASTimeEntityDescription(
+        key="light_off",
+        name="Light Off",
+        icon="mdi:lightbulb-off-outline",
+    ),
+)
+
+
 def utc_to_local(value):
     utc_aware = datetime.utcnow().astimezone(datetime.utcnow().astimezone().tzinfo)
     local_aware = datetime.now().astimezone()
@@ -100,17 +123,13 @@ async def async_setup_entry(
     """Set up AMAS Tech Sensors."""
     name = entry.data[CONF_NAME]
     amas_data = hass.data[AMAS_DOMAIN][entry.entry_id]
+    api = amas_data[DATA_KEY_API]
+    coordinator = amas_data[DATA_KEY_COORDINATOR]
     numbers = [
-        AMASNumber(
-            amas_data[DATA_KEY_API],
-            amas_data[DATA_KEY_COORDINATOR],
-            name,
-            entry.entry_id,
-            description,
-        )
+        AMASNumber(api, coordinator, name, entry.entry_id, description)
         for description in TIME_TYPES
     ]
-    async_add_entities(numbers, True)
+    async_add_reported_entities(entry, api, coordinator, numbers, async_add_entities)
 
 
 class AMASNumber(AMASTechEntity, TimeEntity):
@@ -129,6 +148,7 @@ class AMASNumber(AMASTechEntity, TimeEntity):
         """Initialize a AMAS sensor."""
         super().__init__(api, coordinator, _name, _device_unique_id)
         self.entity_description = description
+        self.source = tuple(description.key.split('_'))
 
         self._attr_name = f"{_name} {description.name}"
         self._attr_unique_id = f"{self._device_unique_id}/{description.name}"
@@ -149,7 +169,7 @@ class AMASNumber(AMASTechEntity, TimeEntity):
             minutes = str(value.minute) if len(str(value.minute)) == 2 else '0' + str(value.minute)
             military = local_to_utc(hours+minutes)
             _LOGGER.debug("Sending light control " + act_key[1] + ': ' + military)
-            await self.api.control_device({act_key[0]: {act_key[1]: military, 'override': False}})
+            await self.api.control_device({act_key[0]: {act_key[1]: military, 'override': False}}, PRIORITY_SCHEDULE)
         except Exception as err:
             _LOGGER.error("Unable to turn on light control " + act_key[1] + " : %s", err)
         
\ No newline at end of file
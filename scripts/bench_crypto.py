@@ -0,0 +1,116 @@
+"""Benchmark frame decryption: baseline decryptAndVerify vs crypto.py.
+
+Run from the repository root:
+
+    python scripts/bench_crypto.py [--frames N]
+
+Prints the time per frame (decryptAndVerify + loads) and the peak traced
+allocation of decryptAndVerify for both implementations, after checking
+that they decode the same frames and both reject a tampered MAC.
+"""
+from __future__ import annotations
+
+import argparse
+from binascii import a2b_base64
+import hashlib
+import importlib.util
+from json import dumps, loads
+import os
+from pathlib import Path
+import timeit
+import tracemalloc
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+# crypto.py is loaded by path so Home Assistant isn't needed
+_SPEC = importlib.util.spec_from_file_location(
+    "amas_crypto", Path(__file__).parent.parent / "custom_components" / "amas" / "crypto.py"
+)
+crypto = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(crypto)
+
+
+# Baseline implementation, as it was in const.py before the rewrite
+def baseline_decrypt(payload, token):
+    enc = a2b_base64(payload)
+    IV = enc[:16]
+    message = enc[16:]
+    decryptor = Cipher(algorithms.AES(token), modes.CBC(IV)).decryptor()
+    data = decryptor.update(message) + decryptor.finalize()
+    data = bytes((x for x in data if x >= 0x20 and x < 127))
+    return data.decode()
+
+
+def baseline_calculate_mac(enc):
+    return hashlib.sha256(enc.encode()).hexdigest().strip()
+
+
+def baseline_decryptAndVerify(enc_and_mac, token, mactoken):
+    cbcmac = baseline_decrypt(enc_and_mac['base64mac'], mactoken)
+    if baseline_calculate_mac(enc_and_mac['base64enc']) == cbcmac:
+        return baseline_decrypt(enc_and_mac['base64enc'], token)
+    return False
+
+
+REPORT = {
+    'state': {
+        'reported': {
+            'device_id': 123456,
+            'sensors': {'ambient_temperature': 22.61, 'relative_humidity': 48.2, 'water_level': 71.5},
+            'pump': {'status': 1, 'powered': True, 'drain': False, 'interval': 3600, 'runtime': 300},
+            'light': {'status': 1, 'override': '0', 'on': '1100', 'off': '0300'},
+            'alerts': {'water_level_alert': 'Ok', 'temp_alert': 'Ok', 'humidity_alert': 'Ok'},
+        }
+    }
+}
+
+
+def peak_allocation(verify, enc_and_mac: dict, token: bytes, mactoken: bytes) -> int:
+    """Return the lowest peak traced bytes of decrypting one frame.
+
+    The first calls warm up caches of the cryptography backend, so the
+    lowest of several warm measurements is taken.
+    """
+    peaks = []
+    for _ in range(20):
+        verify(enc_and_mac, token, mactoken)
+        tracemalloc.start()
+        verify(enc_and_mac, token, mactoken)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return min(peaks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=1000)
+    args = parser.parse_args()
+
+    token, mactoken = os.urandom(32), os.urandom(32)
+    frame = crypto.encryptAndMac(dumps(REPORT).encode(), token, mactoken).encode()
+
+    def old(data, token, mactoken):
+        return loads(baseline_decryptAndVerify(loads(data), token, mactoken))
+
+    def new(data, token, mactoken):
+        return loads(crypto.decryptAndVerify(loads(data), token, mactoken))
+
+    assert old(frame, token, mactoken) == new(frame, token, mactoken) == REPORT
+    tampered = loads(frame)
+    tampered['base64enc'] = crypto.encrypt(b'{}', token)
+    assert baseline_decryptAndVerify(tampered, token, mactoken) is False
+    assert crypto.decryptAndVerify(tampered, token, mactoken) is False
+
+    print(f"{len(frame)} byte frame, best of 5 runs of {args.frames} frames")
+    enc_and_mac = loads(frame)
+    for label, decode, verify in (
+        ("baseline", old, baseline_decryptAndVerify),
+        ("crypto.py", new, crypto.decryptAndVerify),
+    ):
+        # Best of several runs, the others are mostly scheduling noise
+        seconds = min(timeit.repeat(lambda: decode(frame, token, mactoken), number=args.frames, repeat=5))
+        peak = peak_allocation(verify, enc_and_mac, token, mactoken)
+        print(f"{label:>10}: {seconds / args.frames * 1e6:7.1f} us/frame, decryptAndVerify peak {peak} bytes")
+
+if __name__ == "__main__":
+    main()
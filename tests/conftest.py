@@ -0,0 +1,64 @@
+"""Fixtures for AMASTech tests."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_socket
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_API_TOKEN, CONF_HOST, CONF_NAME
+from homeassistant.core import HomeAssistant
+
+from custom_components.amas.const import DOMAIN
+
+from .simulator import SimulatedTower
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the integration in every test."""
+
+
+@pytest.fixture
+def loopback(socket_enabled: None) -> None:
+    """Allow connections to the loopback addresses simulated towers use."""
+    pytest_socket.socket_allow_hosts([f"127.0.0.{host}" for host in range(1, 16)])
+
+
+@pytest.fixture
+async def tower(loopback: None) -> AsyncIterator[SimulatedTower]:
+    """Return a simulated tower listening on the loopback interface."""
+    tower = SimulatedTower()
+    await tower.async_start()
+    yield tower
+    await tower.async_stop()
+
+
+async def async_setup_tower(hass: HomeAssistant, tower: SimulatedTower) -> MockConfigEntry:
+    """Set up a config entry for a simulated tower."""
+    access_token, api_token = tower.credentials
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: tower.address,
+            CONF_NAME: f"Tower {tower.report['device_id']}",
+            CONF_ACCESS_TOKEN: access_token,
+            CONF_API_TOKEN: api_token,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+@pytest.fixture
+async def entry(hass: HomeAssistant, tower: SimulatedTower) -> AsyncIterator[MockConfigEntry]:
+    """Set up a config entry for the simulated tower, unload it afterwards."""
+    entry = await async_setup_tower(hass, tower)
+    yield entry
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
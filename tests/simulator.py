@@ -0,0 +1,128 @@
+"""Loopback simulator of an AMAS tower's /control and /metrics endpoints."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from binascii import b2a_base64
+from json import dumps, loads
+import os
+from typing import Any
+
+from aiohttp import web
+
+from custom_components.amas.crypto import decryptAndVerify, encryptAndMac
+from custom_components.amas.outbox import merge_state
+
+
+def _report(device_id: int) -> dict[str, Any]:
+    return {
+        'device_id': device_id,
+        'sensors': {'ambient_temperature': 22.5, 'relative_humidity': 48.0, 'water_level': 70.0},
+        'pump': {'status': 1, 'powered': True, 'drain': False, 'interval': 3600, 'runtime': 300},
+        'light': {'status': 1, 'override': '0', 'on': '1100', 'off': '0300'},
+        'alerts': {'water_level_alert': 'Ok', 'temp_alert': 'Ok', 'humidity_alert': 'Ok'},
+    }
+
+
+class SimulatedTower:
+    """A tower answering with real encrypted envelopes.
+
+    /control applies the desired state it can decrypt and answers with the
+    reported state; a probe it can't decrypt still gets an envelope, like a
+    real tower. /metrics streams frames_per_connection reports and closes,
+    so every connection ends in a reconnect.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', device_id: int = 4242) -> None:
+        """Initialize."""
+        self.host = host
+        self.port = 0
+        self.api_key = os.urandom(32)
+        self.mactoken = os.urandom(32)
+        self.report = _report(device_id)
+        self.control_status = 200
+        # Cleared to hold /control requests until released or stopped
+        self.control_released = asyncio.Event()
+        self.control_released.set()
+        self.frames_per_connection = 1
+        self.frame_interval = 0.0
+        self.control_requests = 0
+        # Latest desired states applied by /control, in order
+        self.control_log: deque[dict[str, Any]] = deque(maxlen=50)
+        self.controls_in_flight = 0
+        self.max_controls_in_flight = 0
+        self.stream_connections = 0
+        self.open_streams = 0
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def address(self) -> str:
+        """Return host:port to configure the integration with."""
+        return f"{self.host}:{self.port}"
+
+    @property
+    def credentials(self) -> tuple[str, str]:
+        """Return the base64 access token and API token."""
+        return (
+            b2a_base64(self.api_key).decode().strip(),
+            b2a_base64(self.mactoken).decode().strip(),
+        )
+
+    def envelope(self, state: dict[str, Any] | None = None) -> str:
+        """Return the reported state encrypted and MACed."""
+        body = {'state': {'reported': self.report if state is None else state}}
+        return encryptAndMac(dumps(body).encode(), self.api_key, self.mactoken)
+
+    async def async_start(self, port: int = 0) -> None:
+        """Start listening, on a free port unless one is given."""
+        app = web.Application()
+        app.router.add_post('/control', self._control)
+        app.router.add_get('/metrics', self._metrics)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def async_stop(self) -> None:
+        """Stop listening and close open connections."""
+        self.control_released.set()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _control(self, request: web.Request) -> web.Response:
+        self.control_requests += 1
+        self.controls_in_flight += 1
+        self.max_controls_in_flight = max(self.max_controls_in_flight, self.controls_in_flight)
+        try:
+            await self.control_released.wait()
+        finally:
+            self.controls_in_flight -= 1
+        if self.control_status != 200:
+            return web.Response(status=self.control_status)
+        payload = await request.json()
+        if (plain := decryptAndVerify(payload, self.api_key, self.mactoken)) is not False:
+            desired = loads(plain)['state']['desired']
+            self.control_log.append(desired)
+            self.report = merge_state(self.report, desired)
+            return web.Response(text=self.envelope(), content_type='application/json')
+        # Not our keys: answer with an envelope the caller can't open
+        return web.Response(
+            text=encryptAndMac(b'{}', os.urandom(32), os.urandom(32)),
+            content_type='application/json',
+        )
+
+    async def _metrics(self, request: web.Request) -> web.WebSocketResponse:
+        self.stream_connections += 1
+        self.open_streams += 1
+        ws = web.WebSocketResponse()
+        try:
+            await ws.prepare(request)
+            for _ in range(self.frames_per_connection):
+                await ws.send_str(self.envelope())
+                await asyncio.sleep(self.frame_interval)
+            await ws.close()
+        finally:
+            self.open_streams -= 1
+        return ws
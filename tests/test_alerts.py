@@ -0,0 +1,85 @@
+"""Tests for the fleet alert engine."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.amas.alerts import FleetAlertEngine
+from custom_components.amas.const import ALERT_BATCH_INTERVAL, EVENT_ALERT
+
+RULES = [
+    {'name': 'hot', 'metric': 'ambient_temperature', 'above': 30, 'hysteresis': 2},
+    {'name': 'dry', 'metric': 'water_level', 'below': 20, 'hysteresis': 5},
+]
+
+
+async def _async_report(
+    hass: HomeAssistant, engine: FleetAlertEngine, entry_id: str, **sensors: Any
+) -> None:
+    """Feed a report and run the batch evaluation it schedules."""
+    engine.async_update(entry_id, {'sensors': sensors})
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=ALERT_BATCH_INTERVAL))
+    await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize(
+    ("metric", "readings", "expected"),
+    [
+        # Raises above 30, clears at 28 or lower
+        ('ambient_temperature', [25, 31, 29, 30.5, 28, 29], [None, True, None, None, False, None]),
+        # Raises below 20, clears at 25 or higher
+        ('water_level', [50, 19, 24, 15, 25, 21], [None, True, None, None, False, None]),
+    ],
+)
+async def test_transitions_with_hysteresis(
+    hass: HomeAssistant, metric: str, readings: list[float], expected: list[bool | None]
+) -> None:
+    """Events fire on transitions only, never inside the hysteresis band."""
+    engine = FleetAlertEngine(hass, RULES)
+    events = async_capture_events(hass, EVENT_ALERT)
+    for reading, active in zip(readings, expected):
+        events.clear()
+        await _async_report(hass, engine, 'tower', **{metric: reading})
+        if active is None:
+            assert not events, reading
+        else:
+            assert [(event.data['metric'], event.data['active']) for event in events] == [(metric, active)]
+            assert events[0].data['value'] == reading
+
+
+async def test_missing_reading_keeps_state(hass: HomeAssistant) -> None:
+    """A NaN or absent reading neither raises nor clears."""
+    engine = FleetAlertEngine(hass, RULES)
+    events = async_capture_events(hass, EVENT_ALERT)
+    await _async_report(hass, engine, 'tower', ambient_temperature=31, water_level=50)
+    assert [event.data['rule'] for event in events] == ['hot']
+
+    await _async_report(hass, engine, 'tower', ambient_temperature=float('nan'))
+    await _async_report(hass, engine, 'tower')
+    await _async_report(hass, engine, 'tower', ambient_temperature=31, water_level=50)
+    assert len(events) == 1
+
+
+async def test_forget_drops_tower_silently(hass: HomeAssistant) -> None:
+    """A forgotten tower fires no clear event and raises afresh when back."""
+    engine = FleetAlertEngine(hass, RULES)
+    events = async_capture_events(hass, EVENT_ALERT)
+    await _async_report(hass, engine, 'tower', ambient_temperature=31)
+    await _async_report(hass, engine, 'other', ambient_temperature=32)
+    assert len(events) == 2
+
+    engine.async_forget('tower')
+    await _async_report(hass, engine, 'other', ambient_temperature=32)
+    assert len(events) == 2
+
+    await _async_report(hass, engine, 'tower', ambient_temperature=31)
+    assert [(event.data['entry_id'], event.data['active']) for event in events[2:]] == [('tower', True)]
@@ -0,0 +1,91 @@
+"""Tests for recording and replaying tower traffic."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry, MockUser
+
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, Unauthorized
+
+from custom_components.amas.capture import FRAME, TrafficRecorder, read_capture
+from custom_components.amas.const import (
+    DATA_KEY_API,
+    DOMAIN,
+    SERVICE_REPLAY,
+    SERVICE_START_CAPTURE,
+    SERVICE_STOP_CAPTURE,
+)
+
+from .simulator import SimulatedTower
+
+
+def test_recorder_round_trip(tmp_path: Path) -> None:
+    """Queued records end up in the file in order."""
+    recorder = TrafficRecorder(str(tmp_path / "tower.capture"))
+    recorder.record(FRAME, b"dropped, not open yet")
+    recorder.open()
+    for index in range(100):
+        recorder.record(FRAME, f"frame {index}")
+    recorder.close()
+    assert recorder.records == 100
+    assert [data for _, _, data in read_capture(recorder.path)] == [
+        f"frame {index}".encode() for index in range(100)
+    ]
+
+
+async def test_capture_and_replay(
+    hass: HomeAssistant, entry: MockConfigEntry, tower: SimulatedTower, tmp_path: Path
+) -> None:
+    """A captured frame replays through the hub's decode path."""
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    api = hass.data[DOMAIN][entry.entry_id][DATA_KEY_API]
+    path = str(tmp_path / "tower.capture")
+    await hass.services.async_call(
+        DOMAIN, SERVICE_START_CAPTURE, {"entry_id": entry.entry_id, "path": path}, blocking=True
+    )
+    api._record(FRAME, tower.envelope())
+    assert await api.control_device({'pump': {'powered': False}})
+    await api.async_stop_capture()
+    assert len(list(read_capture(path))) == 3
+
+    tower.report = {**tower.report, 'sensors': {**tower.report['sensors'], 'water_level': 12.0}}
+    api._record(FRAME, tower.envelope())
+    await hass.services.async_call(
+        DOMAIN, SERVICE_REPLAY, {"entry_id": entry.entry_id, "path": path, "speed": 0}, blocking=True
+    )
+    assert api.device_info['pump']['powered'] is False
+
+
+@pytest.mark.parametrize("service", [SERVICE_START_CAPTURE, SERVICE_REPLAY])
+async def test_capture_paths_must_be_allowed(
+    hass: HomeAssistant, entry: MockConfigEntry, service: str
+) -> None:
+    """Paths outside allowlist_external_dirs are refused."""
+    with pytest.raises(HomeAssistantError, match="not allowed"):
+        await hass.services.async_call(
+            DOMAIN, service, {"entry_id": entry.entry_id, "path": "/etc/amas.capture"}, blocking=True
+        )
+
+
+async def test_capture_needs_an_admin(
+    hass: HomeAssistant, entry: MockConfigEntry, hass_read_only_user: MockUser
+) -> None:
+    """Non-admin users can't start a capture."""
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_START_CAPTURE,
+            {"entry_id": entry.entry_id},
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
+
+
+async def test_capture_needs_a_tower(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Global keys of the integration's data aren't towers."""
+    with pytest.raises(HomeAssistantError, match="No loaded AMAS tower"):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_STOP_CAPTURE, {"entry_id": "sessions"}, blocking=True
+        )
@@ -0,0 +1,63 @@
+"""Tests for LAN discovery of towers."""
+from __future__ import annotations
+
+import aiohttp
+import pytest
+from pytest_homeassistant_custom_component.common import MockUser
+
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, Unauthorized
+from homeassistant.setup import async_setup_component
+
+from custom_components.amas.const import DOMAIN, SERVICE_DISCOVER
+from custom_components.amas.discovery import async_scan, hosts_in_network
+
+from .simulator import SimulatedTower
+
+
+async def test_scan_finds_simulated_towers(loopback: None) -> None:
+    """Only the simulated towers of a loopback network are reported."""
+    towers = [SimulatedTower('127.0.0.2'), SimulatedTower('127.0.0.5')]
+    await towers[0].async_start()
+    await towers[1].async_start(towers[0].port)
+    try:
+        async with aiohttp.ClientSession() as session:
+            found = await async_scan(
+                session, hosts_in_network('127.0.0.0/28', towers[0].port), concurrency=4, timeout=1
+            )
+    finally:
+        for tower in towers:
+            await tower.async_stop()
+    assert found == [tower.address for tower in towers]
+    assert all(tower.control_requests == 1 for tower in towers)
+
+
+def test_hosts_in_network_limits_the_prefix() -> None:
+    """A /22 is expanded, anything wider is refused."""
+    assert len(hosts_in_network('10.0.0.0/22')) == 1022
+    assert hosts_in_network('10.0.0.0/30', 8080) == ['10.0.0.1:8080', '10.0.0.2:8080']
+    with pytest.raises(ValueError):
+        hosts_in_network('10.0.0.0/8')
+
+
+async def test_discover_service_rejects_bad_networks(hass: HomeAssistant) -> None:
+    """Invalid or too wide networks fail the service call."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    for network in ('10.0.0.0/8', 'not-a-network'):
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_DISCOVER, {'network': network}, blocking=True
+            )
+
+
+async def test_discover_needs_an_admin(hass: HomeAssistant, hass_read_only_user: MockUser) -> None:
+    """Non-admin users can't scan the LAN."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_DISCOVER,
+            {'hosts': ['127.0.0.1']},
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
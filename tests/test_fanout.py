@@ -0,0 +1,60 @@
+"""Tests for the server-sent events stream of decoded reports."""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.amas.const import (
+    CONF_STREAM_ENDPOINT,
+    DATA_KEY_API,
+    DATA_KEY_STREAM_VIEW,
+    DOMAIN,
+)
+
+
+async def test_stream_endpoint_is_opt_in(
+    hass: HomeAssistant, entry: MockConfigEntry, hass_client
+) -> None:
+    """The endpoint is registered by the option and refuses towers without it."""
+    assert not hass.data[DOMAIN].get(DATA_KEY_STREAM_VIEW)
+    hass.config_entries.async_update_entry(entry, options={CONF_STREAM_ENDPOINT: True})
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN][DATA_KEY_STREAM_VIEW]
+
+    hass.config_entries.async_update_entry(entry, options={CONF_STREAM_ENDPOINT: False})
+    await hass.async_block_till_done()
+    client = await hass_client()
+    assert (await client.get(f"/api/amas/stream/{entry.entry_id}")).status == 404
+
+
+async def test_stream_notices_gone_client(
+    hass: HomeAssistant, entry: MockConfigEntry, hass_client
+) -> None:
+    """A quiet stream sends keepalives and unsubscribes a client that left."""
+    api = hass.data[DOMAIN][entry.entry_id][DATA_KEY_API]
+    hass.config_entries.async_update_entry(entry, options={CONF_STREAM_ENDPOINT: True})
+    await hass.async_block_till_done()
+    client = await hass_client()
+    with patch("custom_components.amas.fanout.FANOUT_KEEPALIVE_INTERVAL", 0.05):
+        response = await client.get(f"/api/amas/stream/{entry.entry_id}")
+        assert response.status == 200
+        assert await response.content.readline() == b": keepalive\n"
+        assert api.fanout.has_subscribers
+        response.close()
+        await asyncio.sleep(0.2)
+    assert not api.fanout.has_subscribers
+
+
+async def test_subscribe_needs_a_tower(
+    hass: HomeAssistant, entry: MockConfigEntry, hass_ws_client
+) -> None:
+    """Global keys of the integration's data aren't towers."""
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 1, "type": "amas/subscribe", "entry_id": "scheduler"})
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "not_found"
@@ -0,0 +1,57 @@
+"""Tests for the water depletion forecast."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from custom_components.amas.const import FORECAST_MIN_SPAN, FORECAST_REFILL_JUMP
+from custom_components.amas.forecast import DepletionForecaster
+
+HOUR = 3600
+
+
+def _drain(
+    forecaster: DepletionForecaster, start: float, rate: float, seconds: int, noise: float = 0.0
+) -> None:
+    """Feed a linear drain of rate points per hour, one sample every 10 s."""
+    rng = random.Random(0)
+    for now in range(0, seconds + 1, 10):
+        forecaster.add(now, start - rate * now / HOUR + rng.gauss(0, noise))
+
+
+def test_noisy_drain_forecast() -> None:
+    """4 h of a noisy 3.6 %/h drain from 80 % forecasts the true time to empty."""
+    forecaster = DepletionForecaster()
+    _drain(forecaster, 80, 3.6, 4 * HOUR, noise=0.5)
+    expected = (80 - 3.6 * 4) / 3.6
+    assert forecaster.seconds_until(0) / HOUR == pytest.approx(expected, abs=0.25)
+
+
+def test_refill_starts_over() -> None:
+    """A jump up of FORECAST_REFILL_JUMP points resets the fit."""
+    forecaster = DepletionForecaster()
+    _drain(forecaster, 80, 3.6, HOUR)
+    assert forecaster.seconds_until(0) is not None
+
+    forecaster.add(HOUR + 10, forecaster.level + FORECAST_REFILL_JUMP)
+    assert forecaster.refills == 1
+    assert forecaster.slope is None
+    assert forecaster.seconds_until(0) is None
+
+
+def test_no_forecast_before_min_span() -> None:
+    """A fit over less than FORECAST_MIN_SPAN seconds isn't trusted."""
+    forecaster = DepletionForecaster()
+    _drain(forecaster, 80, 3.6, FORECAST_MIN_SPAN - 10)
+    assert forecaster.seconds_until(0) is None
+    forecaster.add(FORECAST_MIN_SPAN, 80 - 3.6 * FORECAST_MIN_SPAN / HOUR)
+    assert forecaster.seconds_until(0) is not None
+
+
+def test_rising_level_has_no_forecast() -> None:
+    """A level that isn't falling never reaches the target."""
+    forecaster = DepletionForecaster()
+    _drain(forecaster, 40, -1.0, HOUR)
+    assert forecaster.slope > 0
+    assert forecaster.seconds_until(0) is None
@@ -0,0 +1,79 @@
+"""Tests for the tower hub."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from custom_components.amas.const import (
+    DATA_KEY_API,
+    DATA_KEY_COORDINATOR,
+    DOMAIN,
+    PRIORITY_NORMAL,
+    PRIORITY_SAFETY,
+    PRIORITY_SCHEDULE,
+)
+
+from .simulator import SimulatedTower
+
+
+async def test_failing_consumer_does_not_stop_updates(
+    hass: HomeAssistant,
+    entry: MockConfigEntry,
+    tower: SimulatedTower,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """A report the forecast chokes on still reaches the coordinator."""
+    api = hass.data[DOMAIN][entry.entry_id][DATA_KEY_API]
+    coordinator = hass.data[DOMAIN][entry.entry_id][DATA_KEY_COORDINATOR]
+    calls = []
+    unsub = coordinator.async_add_listener(lambda: calls.append(None))
+    tower.report = {**tower.report, 'sensors': {**tower.report['sensors'], 'water_level': 'n/a'}}
+
+    assert api.handle_frame(tower.envelope())
+    assert len(calls) == 1
+    assert api.device_info['sensors']['water_level'] == 'n/a'
+    assert "Error handling a report" in caplog.text
+    unsub()
+
+
+def _runtime(value: int) -> dict:
+    return {'pump': {'runtime': value}}
+
+
+async def test_command_ordering(
+    hass: HomeAssistant, entry: MockConfigEntry, tower: SimulatedTower
+) -> None:
+    """Commands go out one at a time, by priority, then in submission order."""
+    api = hass.data[DOMAIN][entry.entry_id][DATA_KEY_API]
+    tower.control_log.clear()
+    tower.control_released.clear()
+    in_flight = asyncio.create_task(api.control_device(_runtime(1)))
+    while not tower.controls_in_flight:
+        await asyncio.sleep(0.01)
+
+    queued = [
+        asyncio.create_task(api.control_device(_runtime(2), PRIORITY_SCHEDULE)),
+        asyncio.create_task(api.control_device(_runtime(3), PRIORITY_NORMAL)),
+        asyncio.create_task(api.control_device(_runtime(4), PRIORITY_NORMAL)),
+        asyncio.create_task(api.control_device(_runtime(5), PRIORITY_SAFETY)),
+    ]
+    expired = asyncio.create_task(
+        api.control_device(_runtime(6), PRIORITY_SAFETY, deadline=0.05, buffer=False)
+    )
+    await asyncio.sleep(0.1)
+    assert tower.max_controls_in_flight == 1
+    tower.control_released.set()
+
+    assert await in_flight
+    assert await asyncio.gather(*queued) == [True] * 4
+    with pytest.raises(ConfigEntryNotReady):
+        await expired
+    assert list(tower.control_log) == [_runtime(value) for value in (1, 5, 3, 4, 2)]
+    assert tower.max_controls_in_flight == 1
+    assert api.command_stats['expired'] == 1
+    assert api.command_stats['sent'] == 5
@@ -0,0 +1,48 @@
+"""Tests for importing towers from YAML."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_API_TOKEN, CONF_HOST, CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.amas.const import DOMAIN
+
+from .simulator import SimulatedTower
+
+
+def _conf(name: str, tower: SimulatedTower) -> dict[str, str]:
+    access_token, api_token = tower.credentials
+    return {
+        CONF_NAME: name,
+        CONF_HOST: tower.address,
+        CONF_ACCESS_TOKEN: access_token,
+        CONF_API_TOKEN: api_token,
+    }
+
+
+async def test_import_reports_each_failure(
+    hass: HomeAssistant, loopback: None, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Passing towers are imported, failures are summarized with their reason."""
+    towers = [SimulatedTower(f"127.0.0.{host}", device_id=host) for host in (2, 3, 4)]
+    for tower in towers:
+        await tower.async_start()
+    towers[1].control_status = 401
+    confs = [_conf(name, tower) for name, tower in zip("ABC", towers)]
+    await towers[2].async_stop()
+
+    assert await async_setup_component(hass, DOMAIN, {DOMAIN: confs})
+    await hass.async_block_till_done()
+
+    assert [entry.title for entry in hass.config_entries.async_entries(DOMAIN)] == ["A"]
+    assert "Imported 1 of 3 towers from YAML" in caplog.text
+    assert f"B ({towers[1].address}): authentication failed" in caplog.text
+    assert f"C ({towers[2].address}): not reachable" in caplog.text
+
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    for tower in towers[:2]:
+        await tower.async_stop()
@@ -0,0 +1,112 @@
+"""Tests for the light schedule."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from custom_components.amas.const import LIGHT_SCHEDULE_GRACE
+from custom_components.amas.light_schedule import LightSchedule, next_occurrence, parse_hhmm
+
+
+class FakeHub:
+    """The parts of the hub the schedule uses."""
+
+    def __init__(self, status: int) -> None:
+        """Initialize."""
+        self.host = "tower"
+        self.stream_age = 0.0
+        self.device_info = {'light': {'status': status}}
+        self.commands: list[tuple[dict[str, Any], bool]] = []
+
+    async def control_device(self, state: dict[str, Any], priority: int, buffer: bool = True) -> bool:
+        """Record a command."""
+        self.commands.append((state, buffer))
+        return True
+
+
+def _hhmm(when: datetime) -> str:
+    return when.strftime("%H%M")
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("0730", (7, 30)), ("730", (7, 30)), (1800, (18, 0)), ("2400", None), ("0960", None), ("ab", None), (None, None)],
+)
+def test_parse_hhmm(value: Any, expected: tuple[int, int] | None) -> None:
+    """Only valid HHMM times parse."""
+    assert parse_hhmm(value) == expected
+
+
+def test_next_occurrence_rolls_over() -> None:
+    """A time that passed today, or is now, is tomorrow."""
+    now = datetime(2024, 3, 31, 23, 0, tzinfo=timezone.utc)
+    assert next_occurrence(23, 30, now) == datetime(2024, 3, 31, 23, 30, tzinfo=timezone.utc)
+    assert next_occurrence(23, 0, now) == datetime(2024, 4, 1, 23, 0, tzinfo=timezone.utc)
+    assert next_occurrence(3, 0, now) == datetime(2024, 4, 1, 3, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("light", [{'on': '0800', 'off': '0800'}, {'on': 'xx', 'off': '0800'}, {}])
+async def test_no_timer_without_valid_schedule(hass: HomeAssistant, light: dict[str, str]) -> None:
+    """Equal, invalid or missing times leave no transition and no timer."""
+    schedule = LightSchedule(hass, FakeHub(1))
+    schedule.async_update({'light': light})
+    assert schedule.next_on is None and schedule.next_off is None
+    assert schedule._unsub is None
+
+
+async def test_single_timer_per_tower(hass: HomeAssistant) -> None:
+    """Repeated updates keep exactly one timer."""
+    active = 0
+
+    def track(*args: Any) -> Any:
+        nonlocal active
+        active += 1
+        unsub = async_track_point_in_utc_time(*args)
+
+        def cancel() -> None:
+            nonlocal active
+            active -= 1
+            unsub()
+
+        return cancel
+
+    schedule = LightSchedule(hass, FakeHub(1))
+    with patch("custom_components.amas.light_schedule.async_track_point_in_utc_time", track):
+        for hour in range(5):
+            schedule.async_update({'light': {'on': f"{hour:02}00", 'off': '2300'}})
+            schedule.async_update({'light': {'on': f"{hour:02}00", 'off': '2300'}})
+            assert active == 1
+        schedule.async_stop()
+    assert active == 0
+
+
+@pytest.mark.parametrize("enforce", [False, True])
+async def test_missed_transition(hass: HomeAssistant, enforce: bool) -> None:
+    """A transition the tower didn't make is counted, and corrected with enforce."""
+    hub = FakeHub(0)
+    schedule = LightSchedule(hass, hub)
+    schedule.enforce = enforce
+    now = dt_util.utcnow()
+    schedule.async_update(
+        {'light': {'on': _hhmm(now + timedelta(minutes=10)), 'off': _hhmm(now + timedelta(hours=12))}}
+    )
+    due = schedule.next_on + timedelta(seconds=LIGHT_SCHEDULE_GRACE + 1)
+    async_fire_time_changed(hass, due)
+    await hass.async_block_till_done()
+
+    assert schedule.missed == 1
+    if enforce:
+        assert hub.commands == [({'light': {'override': '1'}}, False)]
+        assert schedule.enforced == 1
+    else:
+        assert not hub.commands
+    assert schedule._unsub is not None
+    schedule.async_stop()
@@ -0,0 +1,88 @@
+"""Tests for a tower that keeps streaming while /control fails."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.amas.breaker import CLOSED, OPEN
+from custom_components.amas.const import (
+    BREAKER_FAILURE_THRESHOLD,
+    DATA_KEY_API,
+    DOMAIN,
+    EVENT_OUTBOX_REPLAYED,
+    OUTBOX_REPLAY_BACKOFF,
+)
+from custom_components.amas.hub import AMASHub
+
+from .simulator import SimulatedTower
+
+
+@pytest.fixture
+async def api(
+    hass: HomeAssistant, entry: MockConfigEntry, tower: SimulatedTower
+) -> AsyncIterator[AMASHub]:
+    """Return the hub with a healthy stream and a failing /control."""
+    api = hass.data[DOMAIN][entry.entry_id][DATA_KEY_API]
+    tower.control_status = 500
+    tower.frames_per_connection = 10000
+    tower.frame_interval = 0.01
+    stream = asyncio.create_task(api.stream_info())
+    await asyncio.sleep(0.05)
+    yield api
+    stream.cancel()
+
+
+async def test_stream_does_not_close_control_circuit(
+    hass: HomeAssistant, api: AMASHub, tower: SimulatedTower
+) -> None:
+    """Failed commands open the control circuit while frames keep arriving."""
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        assert not await api.control_device({'pump': {'drain': True}})
+        await asyncio.sleep(0.05)
+    assert api.breaker.state == OPEN
+    assert api.stream_breaker.state == CLOSED
+
+    requests = tower.control_requests
+    assert not await api.control_device({'pump': {'drain': False}})
+    assert tower.control_requests == requests
+
+
+async def test_outbox_replays_on_reconnect_only(
+    hass: HomeAssistant, api: AMASHub, tower: SimulatedTower
+) -> None:
+    """Frames don't replay the outbox, a reconnect does once, then backs off."""
+    events = async_capture_events(hass, EVENT_OUTBOX_REPLAYED)
+    assert not await api.control_device({'pump': {'drain': True}})
+    requests = tower.control_requests
+    await asyncio.sleep(0.3)
+    assert tower.control_requests == requests
+
+    reconnect = asyncio.create_task(api.stream_info())
+    await asyncio.sleep(0.3)
+    assert tower.control_requests == requests + 1
+    reconnect.cancel()
+
+    tower.control_status = 200
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=OUTBOX_REPLAY_BACKOFF))
+    await asyncio.sleep(0.3)
+    assert tower.control_requests == requests + 2
+    assert not api.outbox.pending
+    assert events[0].data['applied'] == {'pump': {'drain': True}}
+
+
+async def test_light_schedule_enforcement_is_not_buffered(api: AMASHub) -> None:
+    """A correction that can't be sent is dropped and not counted."""
+    await api.light_schedule._async_enforce(True)
+    assert api.light_schedule.enforced == 0
+    assert not api.outbox.pending
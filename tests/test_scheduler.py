@@ -0,0 +1,82 @@
+"""Tests for the fleet-wide state write budget."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.amas.scheduler import StateWriteScheduler
+
+
+class FakeEntity:
+    """Records its state writes in a shared log."""
+
+    def __init__(self, name: str, log: list[str]) -> None:
+        """Initialize."""
+        self.name = name
+        self.log = log
+
+    def async_write_ha_state(self) -> None:
+        """Record a write."""
+        self.log.append(self.name)
+
+
+async def _async_flush(hass: HomeAssistant, seconds: float = 1) -> None:
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+    await hass.async_block_till_done()
+
+
+async def test_budget_shared_round_robin(hass: HomeAssistant) -> None:
+    """A chatty tower can't starve a quiet one, and the budget caps each flush."""
+    log: list[str] = []
+    scheduler = StateWriteScheduler(hass, budget=2, interval=1)
+    for index in range(5):
+        scheduler.async_schedule("chatty", FakeEntity(f"chatty{index}", log), False)
+    scheduler.async_schedule("quiet", FakeEntity("quiet", log), False)
+    assert not log
+
+    await _async_flush(hass, 1)
+    assert log == ["chatty0", "quiet"]
+    await _async_flush(hass, 2)
+    assert log[2:] == ["chatty1", "chatty2"]
+    await _async_flush(hass, 3)
+    await _async_flush(hass, 4)
+    assert log[4:] == ["chatty3", "chatty4"]
+    assert scheduler.as_dict() == {
+        "immediate": 0, "deferred": 6, "merged": 0, "written": 6, "queued": 0,
+    }
+
+
+async def test_immediate_and_merged_writes(hass: HomeAssistant) -> None:
+    """Urgent writes bypass the queue, repeated updates of a queued entity merge."""
+    log: list[str] = []
+    scheduler = StateWriteScheduler(hass, budget=2, interval=1)
+    sensor = FakeEntity("sensor", log)
+    scheduler.async_schedule("tower", FakeEntity("switch", log), True)
+    assert log == ["switch"]
+    for _ in range(3):
+        scheduler.async_schedule("tower", sensor, False)
+
+    await _async_flush(hass)
+    assert log == ["switch", "sensor"]
+    assert scheduler.as_dict() == {
+        "immediate": 1, "deferred": 1, "merged": 2, "written": 1, "queued": 0,
+    }
+
+
+async def test_cancel_stops_timer(hass: HomeAssistant) -> None:
+    """Cancelling the last queued write drops the tower and the flush timer."""
+    log: list[str] = []
+    scheduler = StateWriteScheduler(hass, budget=2, interval=1)
+    sensor = FakeEntity("sensor", log)
+    scheduler.async_schedule("tower", sensor, False)
+    assert scheduler._unsub is not None
+
+    scheduler.async_cancel("tower", sensor)
+    assert scheduler._unsub is None
+    assert scheduler.as_dict()["queued"] == 0
+    await _async_flush(hass)
+    assert not log
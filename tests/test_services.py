@@ -0,0 +1,68 @@
+"""Tests for the integration-wide services."""
+from __future__ import annotations
+
+import gzip
+from json import loads
+from pathlib import Path
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.setup import async_setup_component
+
+from custom_components.amas.const import (
+    DATA_KEY_API,
+    DATA_KEY_COORDINATOR,
+    DOMAIN,
+    SERVICE_EXPORT_SNAPSHOT,
+    SERVICE_PROFILE,
+)
+
+
+@pytest.mark.parametrize(("service", "data"), [(SERVICE_PROFILE, {"duration": 1}), (SERVICE_EXPORT_SNAPSHOT, {})])
+async def test_paths_must_be_allowed(hass: HomeAssistant, service: str, data: dict) -> None:
+    """Services writing files refuse paths outside allowlist_external_dirs."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    with pytest.raises(HomeAssistantError, match="not allowed"):
+        await hass.services.async_call(
+            DOMAIN, service, {**data, "path": "/etc/amas.out"}, blocking=True
+        )
+
+
+async def test_profile_writes_a_file(
+    hass: HomeAssistant, entry: MockConfigEntry, tmp_path: Path
+) -> None:
+    """A short profile of a loaded tower is written to an allowed path."""
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    hass.data[DOMAIN]["global"] = {DATA_KEY_COORDINATOR: None}
+    path = tmp_path / "amas.prof"
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PROFILE, {"duration": 1, "path": str(path)}, blocking=True
+    )
+    assert path.stat().st_size > 0
+
+
+async def test_export_snapshot(
+    hass: HomeAssistant, entry: MockConfigEntry, tmp_path: Path
+) -> None:
+    """The snapshot has one record per loaded tower, or per buffered report."""
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    # Global data shaped like a tower's isn't one
+    hass.data[DOMAIN]["global"] = {DATA_KEY_API: None}
+    path = tmp_path / "snapshot.jsonl.gz"
+    await hass.services.async_call(
+        DOMAIN, SERVICE_EXPORT_SNAPSHOT, {"path": str(path)}, blocking=True
+    )
+    with gzip.open(path, "rt") as snapshot:
+        records = [loads(line) for line in snapshot]
+    assert [record["entry_id"] for record in records] == [entry.entry_id]
+    assert records[0]["state"]["sensors"]["water_level"] == 70.0
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_EXPORT_SNAPSHOT, {"path": str(path), "history": True}, blocking=True
+    )
+    with gzip.open(path, "rt") as snapshot:
+        assert len(snapshot.readlines()) >= 1
+    assert not (tmp_path / "snapshot.jsonl.gz.partial").exists()
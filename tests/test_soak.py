@@ -0,0 +1,108 @@
+"""Soak test of reconnects, commands and unload against simulated towers."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import gc
+import logging
+import tracemalloc
+import weakref
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.amas.const import DATA_KEY_API, DOMAIN
+
+from .conftest import async_setup_tower
+from .simulator import SimulatedTower
+
+TOWERS = 10
+# Enough to fill each hub's report history and warm up connection pools
+WARMUP_CYCLES = 150
+CYCLES = 130
+# Slack for counters, interned strings and allocator noise
+FOOTPRINT_SLACK = 4096
+# Process-wide allocation growth allowed per tower after warmup
+GROWTH_PER_TOWER = 16 * 1024
+
+
+async def _async_cycle(api, cycles: int) -> None:
+    """Reconnect the stream and send a command, cycles times."""
+    for cycle in range(cycles):
+        # The simulator closes every stream after one frame
+        await api.stream_info()
+        assert await api.control_device({'pump': {'runtime': 60 + cycle % 100}})
+
+
+async def test_soak(hass: HomeAssistant, loopback: None) -> None:
+    """Hub memory stays bounded and unload leaves no tasks or connections."""
+    towers = [SimulatedTower(device_id=device_id) for device_id in range(TOWERS)]
+    for tower in towers:
+        await tower.async_start()
+    tasks_before = asyncio.all_tasks()
+    entries = [await async_setup_tower(hass, tower) for tower in towers]
+    apis = [hass.data[DOMAIN][entry.entry_id][DATA_KEY_API] for entry in entries]
+
+    # pytest keeps every captured log record, and the records keep their
+    # reports alive, which would show up as growth. Debug mode records a
+    # stack for every callback, which makes the soak crawl.
+    logging.disable(logging.INFO)
+    debug = hass.loop.get_debug()
+    hass.loop.set_debug(False)
+    tracemalloc.start()
+    try:
+        await asyncio.gather(*(_async_cycle(api, WARMUP_CYCLES) for api in apis))
+        # Run delayed one-off work, like registry saves, before measuring
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+        await hass.async_block_till_done()
+        footprints = [api.memory_footprint() for api in apis]
+        gc.collect()
+        warm = tracemalloc.take_snapshot()
+        await asyncio.gather(*(_async_cycle(api, CYCLES) for api in apis))
+        await hass.async_block_till_done()
+        gc.collect()
+        end = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        hass.loop.set_debug(debug)
+        logging.disable(logging.NOTSET)
+    # Everything allocated anywhere, not only what the hubs account for
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    growth = sum(
+        stat.size_diff
+        for stat in end.filter_traces(ignore).compare_to(warm.filter_traces(ignore), 'filename')
+    )
+    assert growth <= GROWTH_PER_TOWER * TOWERS, f"grew by {growth} bytes"
+
+    for api, tower, footprint in zip(apis, towers, footprints):
+        assert tower.stream_connections >= WARMUP_CYCLES + CYCLES
+        assert api.command_stats['sent'] == WARMUP_CYCLES + CYCLES
+        assert api.command_stats['failed'] == 0
+        assert api.memory_footprint() <= footprint + FOOTPRINT_SLACK
+
+    # A command stuck in flight must fail its caller on unload
+    towers[0].control_released.clear()
+    stuck = hass.async_create_task(apis[0].control_device({'pump': {'drain': True}}))
+    await asyncio.sleep(0.1)
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert stuck.done() and not await stuck
+    refs = [weakref.ref(api) for api in apis]
+    for api, tower in zip(apis, towers):
+        assert api.stream_task is None
+        assert api.command_task is None
+        assert not api.fanout.has_subscribers
+        assert tower.open_streams == 0
+    for tower in towers:
+        await tower.async_stop()
+    assert not asyncio.all_tasks() - tasks_before - {asyncio.current_task()}
+    assert not any(entry.entry_id in hass.data[DOMAIN] for entry in entries)
+
+    del api, apis, stuck
+    gc.collect()
+    assert all(ref() is None for ref in refs)